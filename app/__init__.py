@@ -3,37 +3,57 @@ from flask import Flask, render_template, request, session, redirect
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect, generate_csrf
-from flask_login import LoginManager
-from models import db, User
+from flask_login import LoginManager, login_required
+from models import db, user_cache
 from api import api
+from api.response_cache import response_cache
 from seeds import seed_commands
-from config import Config
+from config import get_config
+from db_pool import database_pool
+from instrumentation import SQLInstrumentation
+from events import project_events
+from sweeper import overdue_sweeper, task_commands
 
 
 app = Flask(__name__)
-app.config.from_object(Config)
+app.config.from_object(get_config())
 
 # Application Security
 CORS(app)
 # CSRFProtect(app)
 
 db.init_app(app)
+database_pool.init_app(app)
 Migrate(app, db)
+SQLInstrumentation(app)
+project_events.init_app(app)
+overdue_sweeper.init_app(app)
 
 # Setup login manager
 login = LoginManager(app)
 login.login_view = "api.auth.unauthorized"
 
 
+user_cache.configure(
+    maxsize=app.config["USER_CACHE_SIZE"], ttl=app.config["USER_CACHE_TTL"]
+)
+response_cache.configure(
+    backend=app.config["RESPONSE_CACHE_BACKEND"],
+    maxsize=app.config["RESPONSE_CACHE_SIZE"],
+    path=app.config["RESPONSE_CACHE_PATH"],
+)
+
+
 @login.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    return user_cache.get(int(id))
 
 
 app.register_blueprint(api, url_prefix="/api")
 
 # Tell flask about our seed commands
 app.cli.add_command(seed_commands)
+app.cli.add_command(task_commands)
 
 
 @app.after_request
@@ -71,6 +91,21 @@ def api_help():
     return route_list
 
 
+@app.route("/api/metrics")
+@login_required
+def metrics():
+    """
+    Returns process-local cache and pool statistics for this worker
+    """
+    return {
+        "db_pool": database_pool.stats(),
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "events": project_events.stats(),
+        "overdue_sweeper": overdue_sweeper.stats(),
+    }
+
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def react_root(path):
@@ -5,6 +5,8 @@ from .routes.feature_routes import feature_routes
 from .routes.sprint_routes import sprint_routes
 from .routes.task_routes import task_routes
 from .routes.user_routes import user_routes
+from .pagination import PaginationError
+from .serialization import SelectionError
 
 api = Blueprint("api", __name__)
 
@@ -15,3 +17,13 @@ api.register_blueprint(feature_routes, url_prefix="")
 api.register_blueprint(sprint_routes, url_prefix="")
 api.register_blueprint(task_routes, url_prefix="")
 api.register_blueprint(user_routes, url_prefix="")
+
+
+@api.errorhandler(PaginationError)
+def pagination_error(e):
+    return {"message": "Validation error", "errors": e.errors}, 400
+
+
+@api.errorhandler(SelectionError)
+def selection_error(e):
+    return {"message": "Validation error", "errors": e.errors}, 400
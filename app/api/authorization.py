@@ -0,0 +1,99 @@
+from functools import wraps
+from flask_login import current_user
+from models import db, Project, Feature, ProjectAccess, Task
+
+
+def project_access_query(project_id):
+    """
+    Query for (project, role) where role is the current user's role on the
+    project, or None when they have no access
+    """
+    return (
+        db.session.query(Project, ProjectAccess.role)
+        .outerjoin(
+            ProjectAccess,
+            db.and_(
+                ProjectAccess.project_id == Project.id,
+                ProjectAccess.user_id == current_user.id,
+            ),
+        )
+        .filter(Project.id == project_id)
+    )
+
+
+def require_project_access(f):
+    """
+    Loads the project and the user's access in one query and passes the
+    project to the view as the project keyword argument
+    """
+
+    @wraps(f)
+    def decorated_function(project_id, *args, **kwargs):
+        row = project_access_query(project_id).first()
+        if not row:
+            return {"message": "Project couldn't be found"}, 404
+        project, role = row
+        if role is None:
+            return {"message": "Unauthorized"}, 403
+        return f(project_id, *args, project=project, **kwargs)
+
+    return decorated_function
+
+
+def require_feature_access(f):
+    """
+    Like require_project_access for routes nested under a feature: loads
+    the project, the feature (which must belong to it) and the user's access
+    in one query and passes both objects to the view
+    """
+
+    @wraps(f)
+    def decorated_function(project_id, feature_id, *args, **kwargs):
+        row = (
+            project_access_query(project_id)
+            .add_entity(Feature)
+            .outerjoin(
+                Feature,
+                db.and_(
+                    Feature.id == feature_id,
+                    Feature.project_id == Project.id,
+                ),
+            )
+            .first()
+        )
+        if not row:
+            return {"message": "Project couldn't be found"}, 404
+        project, role, feature = row
+        if role is None:
+            return {"message": "Unauthorized"}, 403
+        if not feature:
+            return {"message": "Feature couldn't be found"}, 404
+        return f(
+            project_id,
+            feature_id,
+            *args,
+            project=project,
+            feature=feature,
+            **kwargs,
+        )
+
+    return decorated_function
+
+
+def require_task_access(f):
+    """
+    Loads the task and the user's role on its project in one query and
+    passes the task to the view as the task keyword argument
+    """
+
+    @wraps(f)
+    def decorated_function(task_id, *args, **kwargs):
+        row = Task.get_task_with_role(task_id, current_user.id)
+        if not row:
+            return {"message": "Task couldn't be found"}, 404
+        task, role = row
+        if role is None:
+            return {"message": "Unauthorized"}, 403
+        return f(task_id, *args, task=task, **kwargs)
+
+    return decorated_function
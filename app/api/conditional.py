@@ -0,0 +1,67 @@
+"""
+Conditional GET for list endpoints.
+
+A collection's version is summarized by one aggregate row: count of rows,
+max(updated_at), a sum over the ids and, where rows carry one, a sum over
+a version counter. Inserts and deletes change the count or id sum and
+updates bump updated_at, so the ETag built from those aggregates (and the
+request's query string) changes whenever the payload would. Views compute it before loading any rows and answer a matching
+If-None-Match with 304.
+"""
+import hashlib
+from flask import Response, request
+from sqlalchemy import func, true
+from models import db
+
+
+def collection_version(
+    query, id_column, updated_column=None, version_column=None
+):
+    """
+    One-row subquery of aggregates that changes whenever query's rows do.
+    id_column may be any integer expression identifying a row.
+    version_column is a per-row counter that only ever goes up, such as
+    Project.cache_version; its sum catches changes that leave the count,
+    the id sum and updated_at as they were.
+    """
+    aggregates = [func.count(), func.sum(id_column)]
+    if updated_column is not None:
+        aggregates.append(func.max(updated_column))
+    if version_column is not None:
+        aggregates.append(func.sum(version_column))
+    return query.order_by(None).with_entities(*aggregates).subquery()
+
+
+def collection_etag(*versions):
+    """
+    Strong ETag for the current request over the given collection versions,
+    fetched in a single query
+    """
+    query = db.session.query(*versions).select_from(versions[0])
+    for version in versions[1:]:
+        # Each version is a single row, so the cross join is one row too
+        query = query.join(version, true())
+    row = query.one()
+    args = sorted(request.args.items(multi=True))
+    digest = hashlib.sha1(repr((request.path, args, tuple(row))).encode())
+    return digest.hexdigest()
+
+
+def not_modified(etag):
+    """
+    Returns a 304 response when the request's If-None-Match matches etag,
+    otherwise None
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    set_validators(response, etag)
+    return response
+
+
+def set_validators(response, etag):
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate it on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
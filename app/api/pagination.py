@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PaginationError(ValueError):
+    def __init__(self, errors):
+        super().__init__("Invalid pagination parameters")
+        self.errors = errors
+
+
+def encode_cursor(values):
+    """
+    Encodes the (sort value, id) of the last row on a page as an opaque token
+    """
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, columns):
+    """
+    Decodes a cursor token back into values typed for the given columns
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            (
+                datetime.fromisoformat(value)
+                if column.type.python_type is datetime
+                else column.type.python_type(value)
+            )
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, TypeError, ValueError):
+        raise PaginationError({"cursor": "Invalid cursor"})
+
+
+class Pagination:
+    """
+    Keyset (cursor) pagination shared by the collection endpoints.
+
+    Rows are ordered by (sort column, id) and each page starts strictly
+    after the last row of the previous one, so the database seeks straight
+    to the page through the index instead of counting past OFFSET rows.
+    """
+
+    def __init__(self, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        self.limit = limit
+        self.cursor = cursor
+
+    @classmethod
+    def from_request(cls):
+        """
+        Reads limit/cursor from the query string. Returns None when neither
+        is given so endpoints can keep their unpaginated response.
+        """
+        args = request.args
+        if "limit" not in args and "cursor" not in args:
+            return None
+        try:
+            limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise PaginationError(
+                {"limit": f"limit must be between 1 and {MAX_PAGE_SIZE}"}
+            )
+        return cls(min(limit, MAX_PAGE_SIZE), args.get("cursor") or None)
+
+    def paginate(self, query, id_column, sort_column=None):
+        """
+        Returns (items, next_cursor) for one page of query
+        """
+        columns = [id_column]
+        if sort_column is not None:
+            columns.insert(0, sort_column)
+        if self.cursor is not None:
+            values = decode_cursor(self.cursor, columns)
+            if len(columns) == 1:
+                query = query.filter(id_column > values[0])
+            else:
+                query = query.filter(db.tuple_(*columns) > db.tuple_(*values))
+
+        items = query.order_by(None).order_by(*columns).limit(self.limit + 1)
+        items = items.all()
+        next_cursor = None
+        if len(items) > self.limit:
+            items = items[: self.limit]
+            last = items[-1]
+            next_cursor = encode_cursor(
+                [getattr(last, column.key) for column in columns]
+            )
+        return items, next_cursor
@@ -0,0 +1,236 @@
+"""
+Response cache for project board reads.
+
+Cached bodies are keyed by (project_id, project cache_version, path, query
+string). Every write to a project's board bumps its cache_version in
+the same transaction (see models/project_version.py), so stale entries are
+never read again and simply age out of the backend. The version comes from
+the project row the authorization decorator already loaded, so a hit costs
+no extra query.
+
+Backends:
+    memory  per-process LRU (the default)
+    sqlite  a SQLite file shared by every worker on the host
+    none    caching disabled
+"""
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, request
+from .conditional import not_modified, set_validators
+
+logger = logging.getLogger("taskflow.cache")
+
+
+class MemoryBackend:
+    """
+    Process-local LRU of (etag, body) entries
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    (etag, body) entries in a SQLite file, shared by all worker processes
+    on the host. Holds roughly the maxsize most recently stored entries.
+    Errors are logged and treated as misses so the cache can't fail a
+    request.
+    """
+
+    name = "sqlite"
+    PRUNE_EVERY = 64
+
+    def __init__(self, path, maxsize=2048):
+        self.path = path
+        self.maxsize = maxsize
+        self._connection = None
+        self._pid = None
+        self._stores = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Connections can't cross a fork, so each worker opens its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=1, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " etag TEXT,"
+                " body BLOB NOT NULL,"
+                " stored INTEGER NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key):
+        try:
+            with self._lock:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT etag, body FROM responses WHERE key = ?",
+                        (key,),
+                    )
+                    .fetchone()
+                )
+        except sqlite3.Error:
+            logger.exception("response cache read failed")
+            return None
+        return (row[0], bytes(row[1])) if row else None
+
+    def set(self, key, entry):
+        etag, body = entry
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?,"
+                        " (SELECT coalesce(max(stored), 0) + 1"
+                        "  FROM responses))",
+                        (key, etag, body),
+                    )
+                    self._stores += 1
+                    if self._stores % self.PRUNE_EVERY == 0:
+                        connection.execute(
+                            "DELETE FROM responses WHERE stored <= "
+                            "(SELECT max(stored) FROM responses) - ?",
+                            (self.maxsize,),
+                        )
+        except sqlite3.Error:
+            logger.exception("response cache write failed")
+
+    def clear(self):
+        with self._lock:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT count(*) FROM responses"
+            ).fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Front for the configured backend with per-process hit/miss counters
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, backend="memory", maxsize=2048, path=None):
+        if backend == "sqlite":
+            self.backend = SQLiteBackend(path, maxsize)
+        elif backend in ("memory", "none"):
+            self.backend = MemoryBackend(maxsize)
+        else:
+            raise ValueError(f"Unknown response cache backend: {backend}")
+        self.enabled = backend != "none" and maxsize > 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(project_id, version):
+        # The path carries the URL parameters (feature_id and so on), so
+        # different boards of one project never share an entry
+        args = urlencode(sorted(request.args.items(multi=True)))
+        return f"{project_id}:{version}:{request.path}?{args}"
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key, entry):
+        self.backend.set(key, entry)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "size": len(self.backend) if self.enabled else 0,
+            "maxsize": self.backend.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cache_project_response(f):
+    """
+    Serves a project-scoped GET from the response cache. Goes below
+    require_project_access/require_feature_access, which pass the loaded
+    project to the view. Only 200 responses are stored.
+    """
+
+    @wraps(f)
+    def decorated_function(project_id, *args, project, **kwargs):
+        if not response_cache.enabled:
+            return f(project_id, *args, project=project, **kwargs)
+
+        key = response_cache.key(project_id, project.cache_version)
+        cached = response_cache.get(key)
+        if cached is not None:
+            etag, body = cached
+            if etag:
+                response = not_modified(etag)
+                if response:
+                    return response
+            response = Response(body, mimetype="application/json")
+            return set_validators(response, etag) if etag else response
+
+        response = f(project_id, *args, project=project, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            etag, _ = response.get_etag()
+            response_cache.set(key, (etag, response.get_data()))
+        return response
+
+    return decorated_function
@@ -1,41 +1,98 @@
 from flask import Blueprint, jsonify, request
-from functools import wraps
-from models import User, Sprint, Project, Feature, db
-from flask_login import login_required, current_user
+from models import Feature, Sprint, Task
+from ..authorization import require_project_access, require_feature_access
+from ..conditional import collection_etag, collection_version, not_modified
+from ..pagination import Pagination
+from ..response_cache import cache_project_response
+from ..serialization import (
+    Selection,
+    attach_sprints,
+    attach_tasks,
+    feature_serializer,
+    json_response,
+)
+from flask_login import login_required
 
 feature_routes = Blueprint("features", __name__)
 
+FEATURE_EXPANSIONS = ("tasks", "sprint")
 
-# ** Authorization Decorator **
-def require_project_access(f):
-    @wraps(f)
-    def decorated_function(project_id, *args, **kwargs):
-        project = Project.query.get(project_id)
-        if not project:
-            return {"message": "Project couldn't be found"}, 404
-        if not current_user.has_project_access(project_id):
-            return {"message": "Unauthorized"}
-        return f(project_id, *args, **kwargs)
 
-    return decorated_function
+def feature_selection():
+    return Selection.from_request(
+        feature_serializer, FEATURE_EXPANSIONS, defaults=("tasks",)
+    )
 
 
 @feature_routes.route("/projects/<int:project_id>/features")
 @login_required
 @require_project_access
-def get_all_features(project_id):
-    print(f"Getting features for project {project_id}")  # Debug print
-    features = Feature.get_features_by_project(project_id)
-    feature_list = [feature.to_dict() for feature in features]
-    print(f"Found {len(feature_list)} features")  # Debug print
-    print(f"Feature data: {feature_list}")  # Debug print
-    return jsonify(feature_list)
+@cache_project_response
+def get_all_features(project_id, project):
+    """
+    Get all features for a project.
+
+    Supports fields=, include=tasks,sprint (tasks by default) and
+    limit/cursor paging. Answers If-None-Match with 304 when neither the
+    features nor anything they embed changed.
+    """
+    selection = feature_selection()
+    features_query = Feature.get_features_by_project(project_id)
+    project_tasks = Task.query.join(Feature).filter(
+        Feature.project_id == project_id
+    )
+
+    versions = [
+        collection_version(features_query, Feature.id, Feature.updated_at)
+    ]
+    if selection.includes("tasks"):
+        versions.append(
+            collection_version(project_tasks, Task.id, Task.updated_at)
+        )
+    if selection.includes("sprint"):
+        versions.append(
+            collection_version(
+                Sprint.get_all_sprints_for_project(project_id),
+                Sprint.id,
+                Sprint.updated_at,
+            )
+        )
+    etag = collection_etag(*versions)
+    response = not_modified(etag)
+    if response:
+        return response
+
+    required = ("id", "sprint_id") if selection.includes("sprint") else ("id",)
+    serializer = selection.serializer(feature_serializer, required)
+    query = serializer.query(features_query)
+
+    page = Pagination.from_request()
+    if page:
+        rows, next_cursor = page.paginate(query, Feature.id)
+        features = serializer.serialize(rows)
+        tasks = Task.query.filter(
+            Task.feature_id.in_([feature["id"] for feature in features])
+        )
+    else:
+        features = serializer.serialize(query)
+        tasks = project_tasks
+
+    if selection.includes("tasks"):
+        attach_tasks(features, tasks)
+    if selection.includes("sprint"):
+        attach_sprints(features)
+
+    if not page:
+        return json_response(features, etag=etag)
+    return json_response(
+        {"features": features, "next_cursor": next_cursor}, etag=etag
+    )
 
 
 @feature_routes.route("/projects/<int:project_id>/features", methods=["POST"])
 @login_required
 @require_project_access
-def create_feature(project_id):
+def create_feature(project_id, project):
     data = request.json
 
     errors = {}
@@ -72,11 +129,8 @@ def create_feature(project_id):
     "/projects/<int:project_id>/features/<int:feature_id>/", methods=["PUT"]
 )
 @login_required
-@require_project_access
-def update_feature(project_id, feature_id):
-    feature = Feature.query.get(feature_id)
-    if not feature:
-        return {"message": "Feature not found"}, 404
+@require_feature_access
+def update_feature(project_id, feature_id, project, feature):
     data = request.json
     if data.get("status") and data["status"] not in Feature.VALID_STATUSES:
         return {
@@ -110,8 +164,8 @@ def update_feature(project_id, feature_id):
     "/projects/<int:project_id>/features/<int:feature_id>/", methods=["DELETE"]
 )
 @login_required
-@require_project_access
-def delete_feature(project_id, feature_id):
+@require_feature_access
+def delete_feature(project_id, feature_id, project, feature):
     try:
         print(
             f"Attempting to delete feature {feature_id} from project {project_id}"
@@ -126,9 +180,10 @@ def delete_feature(project_id, feature_id):
 
 @feature_routes.route("/projects/<int:project_id>/features/<int:feature_id>")
 @login_required
-@require_project_access
-def get_feature(project_id, feature_id):
-    feature = Feature.query.get(feature_id)
-    if not feature:
-        return {"message": "Feature couldn't be found"}, 404
-    return jsonify(feature.to_dict())
+@require_feature_access
+def get_feature(project_id, feature_id, project, feature):
+    """
+    Get a feature. Supports fields= and include=tasks,sprint
+    """
+    selection = feature_selection()
+    return jsonify(selection.trim(feature.to_dict(include=selection.include)))
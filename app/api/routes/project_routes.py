@@ -1,24 +1,47 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from models import db, Project
+from datetime import datetime, timedelta
+from models import (
+    db,
+    Feature,
+    Project,
+    ProjectAccess,
+    Sprint,
+    Task,
+    Tombstone,
+    User,
+)
+from models.loaders import project_options
+from models.project import project_users
+from models.summary import project_summary
+from events import project_events
 from forms import ProjectForm
-from functools import wraps
+from ..authorization import require_project_access
+from ..conditional import collection_etag, collection_version, not_modified
+from ..pagination import Pagination
+from .task_routes import parse_date_arg
+from ..serialization import (
+    Selection,
+    attach_members,
+    feature_serializer,
+    json_response,
+    keyed,
+    project_serializer,
+    sprint_serializer,
+    task_serializer,
+)
 
 
-def require_project_access(f):
-    @wraps(f)
-    def decorated_function(project_id, *args, **kwargs):
-        project = Project.query.get(project_id)
-        if not project:
-            return {"message": "Project couldn't be found"}, 404
-        if not current_user.has_project_access(project_id):
-            return {"message": "Unauthorized"}, 403
-        return f(project_id, *args, **kwargs)
+project_routes = Blueprint("projects", __name__)
 
-    return decorated_function
+# The change feed hands out watermarks slightly in the past so rows written
+# by transactions that were still committing during a read are picked up by
+# the next poll. Feed items are upserts, so repeats are harmless.
+CHANGE_FEED_OVERLAP = timedelta(seconds=5)
 
 
-project_routes = Blueprint("projects", __name__)
+def change_watermark():
+    return datetime.utcnow() - CHANGE_FEED_OVERLAP
 
 
 @project_routes.route("", methods=["GET"])
@@ -26,12 +49,64 @@ project_routes = Blueprint("projects", __name__)
 @login_required
 def get_all_projects():
     """
-    Get all projects for the current user
+    Get all projects for the current user. Supports fields=,
+    include=members (the default), limit/cursor paging and If-None-Match
     """
-    projects = Project.get_all_projects(
+    selection = Selection.from_request(
+        project_serializer, ("members",), defaults=("members",)
+    )
+    projects_query = Project.get_all_projects(
         current_user.id
     )  # Using the class method for getting projects
-    return jsonify({"projects": [project.to_dict() for project in projects]})
+
+    # Membership changes bump cache_version but not updated_at, and a sum
+    # over member ids can't tell {3, 6} from {4, 5}
+    versions = [
+        collection_version(
+            projects_query,
+            Project.id,
+            Project.updated_at,
+            version_column=Project.cache_version,
+        )
+    ]
+    if selection.includes("members"):
+        # Members are read from project_users (see attach_members), which
+        # can list the owner too; project_access leaves owner rows out
+        memberships = db.session.query(project_users).filter(
+            project_users.c.project_id.in_(
+                projects_query.with_entities(Project.id)
+            )
+        )
+        versions.append(
+            collection_version(
+                memberships,
+                project_users.c.project_id * 1000003
+                + project_users.c.user_id,
+            )
+        )
+    etag = collection_etag(*versions)
+    response = not_modified(etag)
+    if response:
+        return response
+
+    # due_date is the pagination sort key, so it's always selected
+    serializer = selection.serializer(project_serializer, select=("due_date",))
+    query = serializer.query(projects_query)
+    page = Pagination.from_request()
+    next_cursor = None
+    if page:
+        rows, next_cursor = page.paginate(
+            query, Project.id, sort_column=Project.due_date
+        )
+    else:
+        rows = query.all()
+    projects = serializer.serialize(rows)
+    if selection.includes("members"):
+        attach_members(projects)
+    response = {"projects": projects}
+    if page:
+        response["next_cursor"] = next_cursor
+    return json_response(response, etag=etag)
 
 
 # In project_routes.py
@@ -67,23 +142,16 @@ def add_project_member(project_id, user_id):
 )
 @login_required
 @require_project_access
-def remove_project_member(project_id, user_id):
+def remove_project_member(project_id, user_id, project):
     """
     Remove a member from a project
     """
-    project = Project.get_project_by_id(project_id, current_user.id)
-
-    if not project:
-        return {"errors": ["Project not found"]}, 404
-
     # Only owner can remove members
     if project.owner_id != current_user.id:
         return {"errors": ["Unauthorized"]}, 403
 
     if Project.remove_user_from_project(user_id, project_id):
-        project = Project.get_project_by_id(
-            project_id, current_user.id
-        )  # Get fresh project data
+        # The commit expired the project, so this serializes fresh data
         return jsonify(project.to_dict())
     else:
         return {"errors": ["Failed to remove member"]}, 400
@@ -94,12 +162,174 @@ def remove_project_member(project_id, user_id):
 @login_required
 def get_project(id):
     """
-    Get a specific project by id
+    Get a specific project by id. Supports fields= and include=members
     """
-    project = Project.get_project_by_id(id, current_user.id)
+    selection = Selection.from_request(
+        project_serializer, ("members",), defaults=("members",)
+    )
+    project = Project.get_project_by_id(
+        id, current_user.id, options=project_options(selection.include)
+    )
     if not project:
         return {"errors": ["Project not found"]}, 404
-    return jsonify(project.to_dict())
+    return jsonify(
+        selection.trim(project.to_dict(include=selection.include))
+    )
+
+
+@project_routes.route("/<int:project_id>/summary", methods=["GET"])
+@login_required
+@require_project_access
+def get_project_summary(project_id, project):
+    """
+    Dashboard aggregates for a project: task counts by status, overdue
+    counts, priority points and percent complete per feature, per sprint
+    and in total, plus each assignee's workload. Not response-cached:
+    overdue counts change with the clock, not only on writes.
+    """
+    return json_response(project_summary(project_id))
+
+
+@project_routes.route("/<int:project_id>/snapshot", methods=["GET"])
+@login_required
+@require_project_access
+def get_project_snapshot(project_id, project):
+    """
+    Everything the board needs in one request: the project and its
+    sprints, features, tasks and users (owner and members, with their
+    role), each keyed by id. Features list their task_ids. Runs a fixed
+    number of queries. watermark is the since= for the first /changes poll.
+    """
+    # Not response cached: the watermark has to be taken when the board is
+    # read, or an idle project would hand out one that ages past retention
+    watermark = change_watermark()
+    # Members come from project_users, as in Project.to_dict
+    members = Project.get_members_by_project([project_id])[project_id]
+    users = User.query.filter(
+        User.id.in_({project.owner_id, *members})
+    ).order_by(User.id)
+    users = [
+        {
+            **user.to_dict(),
+            "role": (
+                ProjectAccess.OWNER
+                if user.id == project.owner_id
+                else ProjectAccess.MEMBER
+            ),
+        }
+        for user in users
+    ]
+
+    sprints = sprint_serializer.all(
+        Sprint.get_all_sprints_for_project(project_id).order_by(Sprint.id)
+    )
+    features = feature_serializer.all(
+        Feature.get_features_by_project(project_id).order_by(Feature.id)
+    )
+    tasks = task_serializer.all(
+        Task.query.join(Feature)
+        .filter(Feature.project_id == project_id)
+        .order_by(Task.id)
+    )
+
+    features = keyed(features)
+    for feature in features.values():
+        feature["task_ids"] = []
+    # A feature created between the two reads isn't in features. Its tasks
+    # are left out as well, and the first /changes poll returns both.
+    board_tasks = []
+    for task in tasks:
+        feature = features.get(str(task["feature_id"]))
+        if feature is not None:
+            feature["task_ids"].append(task["id"])
+            board_tasks.append(task)
+
+    return json_response(
+        {
+            "project": project.to_dict(members=members),
+            "sprints": keyed(sprints),
+            "features": features,
+            "tasks": keyed(board_tasks),
+            "users": keyed(users),
+            "watermark": watermark.isoformat(),
+        }
+    )
+
+
+@project_routes.route("/<int:project_id>/changes", methods=["GET"])
+@login_required
+@require_project_access
+def get_project_changes(project_id, project):
+    """
+    What changed on the project's board after the since= watermark (an ISO
+    datetime from the snapshot or the previous poll): the project if it
+    changed, modified sprints, features and tasks, and the ids deleted
+    since. Poll again with the returned watermark.
+    """
+    try:
+        since = parse_date_arg(request.args.get("since", ""))
+    except ValueError:
+        return {
+            "message": "Validation error",
+            "errors": {"since": "since must be an ISO datetime"},
+        }, 400
+    if since < datetime.utcnow() - Tombstone.RETENTION:
+        return {
+            "message": "since is older than the change history, "
+            "reload the snapshot"
+        }, 410
+
+    watermark = change_watermark()
+    sprints = sprint_serializer.all(
+        Sprint.get_all_sprints_for_project(project_id)
+        .filter(Sprint.updated_at > since)
+        .order_by(Sprint.id)
+    )
+    features = feature_serializer.all(
+        Feature.get_features_by_project(project_id)
+        .filter(Feature.updated_at > since)
+        .order_by(Feature.id)
+    )
+    tasks = task_serializer.all(
+        Task.query.join(Feature)
+        .filter(Feature.project_id == project_id, Task.updated_at > since)
+        .order_by(Task.id)
+    )
+    deleted = {"sprints": [], "features": [], "tasks": []}
+    tombstones = (
+        Tombstone.query.filter(
+            Tombstone.project_id == project_id, Tombstone.deleted_at > since
+        )
+        .with_entities(Tombstone.entity, Tombstone.entity_id)
+        .order_by(Tombstone.id)
+    )
+    for entity, entity_id in tombstones:
+        deleted[f"{entity}s"].append(entity_id)
+
+    return json_response(
+        {
+            "since": since.isoformat(),
+            "watermark": watermark.isoformat(),
+            "project": (
+                project.to_dict() if project.updated_at > since else None
+            ),
+            "sprints": sprints,
+            "features": features,
+            "tasks": tasks,
+            "deleted": deleted,
+        }
+    )
+
+
+@project_routes.route("/<int:project_id>/events", methods=["GET"])
+@login_required
+@require_project_access
+def project_event_stream(project_id, project):
+    """
+    Server-Sent Events stream announcing changes to the project's board.
+    Each change event names the project; fetch /changes to see what changed.
+    """
+    return project_events.stream(project_id)
 
 
 @project_routes.route("", methods=["POST"])  # /projects
@@ -1,33 +1,48 @@
 from flask import Blueprint, jsonify, request
-from models import Sprint, Project
-from flask_login import login_required, current_user
-from functools import wraps
+from models import Feature, Sprint
+from flask_login import login_required
+from ..authorization import require_project_access
+from ..conditional import collection_etag, collection_version, not_modified
+from ..pagination import Pagination
+from ..response_cache import cache_project_response
+from ..serialization import Selection, json_response, sprint_serializer
 
 sprint_routes = Blueprint("sprints", __name__)
 
 
-def require_project_access(f):
-    @wraps(f)
-    def decorated_function(project_id, *args, **kwargs):
-        project = Project.query.get(project_id)
-        if not project:
-            return {"message": "Project couldn't be found"}, 404
-        if not current_user.has_project_access(project_id):
-            return {"message": "Unauthorized"}, 403
-        return f(project_id, *args, **kwargs)
-
-    return decorated_function
-
-
 @sprint_routes.route("/projects/<int:project_id>/sprints")
 @login_required
 @require_project_access
-def get_all_sprints_project(project_id):
+@cache_project_response
+def get_all_sprints_project(project_id, project):
+    """
+    Get all sprints for a project. Supports fields=, limit/cursor paging
+    and If-None-Match
+    """
+    serializer = Selection.from_request(sprint_serializer).serializer(
+        sprint_serializer
+    )
+    sprints = Sprint.get_all_sprints_for_project(project_id)
+    etag = collection_etag(
+        collection_version(sprints, Sprint.id, Sprint.updated_at)
+    )
+    response = not_modified(etag)
+    if response:
+        return response
+
+    query = serializer.query(sprints)
+    page = Pagination.from_request()
     try:
-        sprints = Sprint.get_all_sprints_for_project(project_id).all()
-        if not sprints:
-            return jsonify([])
-        return jsonify([sprint.to_dict() for sprint in sprints])
+        if not page:
+            return json_response(serializer.serialize(query), etag=etag)
+        rows, next_cursor = page.paginate(query, Sprint.id)
+        return json_response(
+            {
+                "sprints": serializer.serialize(rows),
+                "next_cursor": next_cursor,
+            },
+            etag=etag,
+        )
     except Exception as e:
         # Log the error for debugging
         print(f"Error fetching sprints for project {project_id}: {e}")
@@ -37,19 +52,20 @@ def get_all_sprints_project(project_id):
 @sprint_routes.route("/projects/<int:project_id>/sprints/<int:sprint_id>")
 @login_required
 @require_project_access
-def get_single_sprint(project_id, sprint_id):
+def get_single_sprint(project_id, sprint_id, project):
     sprint = Sprint.query.get(sprint_id)
     if not sprint:
         return {"message": "Sprint couldn't be found"}, 404
     if sprint.project_id != project_id:
         return {"message": "Sprint doesn't belong to this project"}, 403
-    return jsonify(sprint.to_dict())
+    selection = Selection.from_request(sprint_serializer)
+    return jsonify(selection.trim(sprint.to_dict()))
 
 
 @sprint_routes.route("/projects/<int:project_id>/sprints", methods=["POST"])
 @login_required
 @require_project_access
-def create_sprint(project_id):
+def create_sprint(project_id, project):
 
     data = request.json
 
@@ -85,7 +101,7 @@ def create_sprint(project_id):
 )
 @login_required
 @require_project_access
-def update_sprint(project_id, sprint_id):
+def update_sprint(project_id, sprint_id, project):
     print(
         "Received data:", request.get_json()
     )  # Debug log to see what we're getting
@@ -121,7 +137,7 @@ def update_sprint(project_id, sprint_id):
 )
 @login_required
 @require_project_access
-def delete_sprint(project_id, sprint_id):
+def delete_sprint(project_id, sprint_id, project):
 
     sprint = Sprint.query.get(sprint_id)
 
@@ -132,3 +148,102 @@ def delete_sprint(project_id, sprint_id):
         return {"message": "Sprint successfully deleted"}, 200
     else:
         return {"message": "Delete failed"}, 400
+
+
+def sprints_in_project(project_id, sprint_ids):
+    ids = [sprint_id for sprint_id in sprint_ids if sprint_id is not None]
+    if not ids:
+        return set()
+    rows = Sprint.query.filter(
+        Sprint.project_id == project_id, Sprint.id.in_(ids)
+    ).with_entities(Sprint.id)
+    return {sprint_id for sprint_id, in rows}
+
+
+@sprint_routes.route(
+    "/projects/<int:project_id>/sprints/<int:sprint_id>/features",
+    methods=["POST"],
+)
+@login_required
+@require_project_access
+def assign_features(project_id, sprint_id, project):
+    """
+    Move features into a sprint with one UPDATE: {"feature_ids": [...]}
+    """
+    if sprint_id not in sprints_in_project(project_id, [sprint_id]):
+        return {"message": "Sprint couldn't be found"}, 404
+
+    data = request.get_json(silent=True) or {}
+    feature_ids = data.get("feature_ids")
+    if (
+        not isinstance(feature_ids, list)
+        or not feature_ids
+        or not all(type(i) is int for i in feature_ids)
+    ):
+        return {
+            "message": "Validation error",
+            "errors": {"feature_ids": "feature_ids must be a list of ids"},
+        }, 400
+
+    found = {
+        feature_id
+        for feature_id, in Feature.get_features_by_project(project_id)
+        .filter(Feature.id.in_(feature_ids))
+        .with_entities(Feature.id)
+    }
+    assigned = 0
+    if found:
+        assigned = Feature.assign_features_to_sprint(
+            project_id, found, sprint_id
+        )
+    return {
+        "sprint_id": sprint_id,
+        "assigned": assigned,
+        "not_found": [i for i in feature_ids if i not in found],
+    }
+
+
+@sprint_routes.route(
+    "/projects/<int:project_id>/sprints/<int:sprint_id>/rollover",
+    methods=["POST"],
+)
+@login_required
+@require_project_access
+def roll_over_sprint(project_id, sprint_id, project):
+    """
+    Move every feature of the sprint that isn't Completed to another sprint
+    (or the backlog with null) in one UPDATE: {"to_sprint_id": id | null}
+    """
+    data = request.get_json(silent=True) or {}
+    if "to_sprint_id" not in data:
+        return {
+            "message": "Validation error",
+            "errors": {"to_sprint_id": "to_sprint_id is required"},
+        }, 400
+    to_sprint_id = data["to_sprint_id"]
+    if to_sprint_id is not None and type(to_sprint_id) is not int:
+        return {
+            "message": "Validation error",
+            "errors": {"to_sprint_id": "to_sprint_id must be an id or null"},
+        }, 400
+    if to_sprint_id == sprint_id:
+        return {
+            "message": "Validation error",
+            "errors": {"to_sprint_id": "Can't roll a sprint over to itself"},
+        }, 400
+
+    found = sprints_in_project(project_id, [sprint_id, to_sprint_id])
+    if sprint_id not in found:
+        return {"message": "Sprint couldn't be found"}, 404
+    if to_sprint_id is not None and to_sprint_id not in found:
+        return {
+            "message": "Validation error",
+            "errors": {"to_sprint_id": "Sprint couldn't be found"},
+        }, 400
+
+    moved = Feature.roll_over_sprint(project_id, sprint_id, to_sprint_id)
+    return {
+        "from_sprint_id": sprint_id,
+        "to_sprint_id": to_sprint_id,
+        "moved": moved,
+    }
@@ -1,88 +1,121 @@
 from flask import Blueprint, jsonify, request
-from models import Task, Feature, Project
+from models import Feature, Task, User
 from flask_login import login_required, current_user
-from functools import wraps
+from datetime import datetime, timezone
+from ..authorization import (
+    require_feature_access,
+    require_project_access,
+    require_task_access,
+)
+from ..conditional import collection_etag, collection_version, not_modified
+from ..pagination import Pagination
+from ..response_cache import cache_project_response
+from ..serialization import Selection, json_response, task_serializer
 
 
 task_routes = Blueprint("tasks", __name__)
 
 
-def require_project_access(f):
-    @wraps(f)
-    def decorated_function(project_id, feature_id, *args, **kwargs):
-        feature = Feature.query.get(feature_id)
-        if not feature:
-            return {"message": "Feature couldn't be found"}, 404
-        project = Project.query.get(project_id)
-        if not project:
-            return {"message": "Project couldn't be found"}, 404
-        if feature.project_id != project_id:
-            return {"message": "Feature couldn't be found"}, 404
-        if not current_user.has_project_access(project_id):
-            return {"message": "Unauthorized"}, 403
-        return f(feature_id, *args, **kwargs)
-
-    return decorated_function
-
-
-def require_task_access(f):
-    @wraps(f)
-    def decorated_function(task_id, *args, **kwargs):
-        # Get task and verify it exists
-        task = Task.query.get(task_id)
-        if not task:
-            return {"message": "Task couldn't be found"}, 404
-
-        # Get feature and verify it exists
-        feature = Feature.query.get(task.feature_id)
-        if not feature:
-            return {"message": "Feature couldn't be found"}, 404
-
-        # Get project and verify it exists
-        project = Project.query.get(feature.project_id)
-        if not project:
-            return {"message": "Project couldn't be found"}, 404
-
-        # Check if user has access using your existing method
-        if not current_user.has_project_access(feature.project_id):
-            return {"message": "Unauthorized"}, 403
-
-        return f(task_id, *args, **kwargs)
-
-    return decorated_function
+def parse_date_arg(value):
+    # Columns hold naive UTC datetimes, so normalise aware values to match
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 
 @task_routes.route(
     "/projects/<int:project_id>/features/<int:feature_id>/tasks"
 )
 @login_required
-@require_project_access
-def get_all_tasks_feature(feature_id):
+@require_feature_access
+@cache_project_response
+def get_all_tasks_feature(project_id, feature_id, project, feature):
     """
-    Get all tasks for a feature
+    Get all tasks for a feature. Supports fields=, limit/cursor paging and
+    If-None-Match
     """
-    tasks = Task.get_all_tasks_for_feature(feature_id).all()
-    return jsonify([task.to_dict() for task in tasks])
+    serializer = Selection.from_request(task_serializer).serializer(
+        task_serializer
+    )
+    tasks = Task.get_all_tasks_for_feature(feature_id)
+    return task_list_response(serializer, tasks)
+
+
+def task_list_response(serializer, tasks):
+    etag = collection_etag(
+        collection_version(tasks, Task.id, Task.updated_at)
+    )
+    response = not_modified(etag)
+    if response:
+        return response
+
+    query = serializer.query(tasks)
+    page = Pagination.from_request()
+    if not page:
+        return json_response(serializer.serialize(query), etag=etag)
+    rows, next_cursor = page.paginate(query, Task.id)
+    return json_response(
+        {
+            "tasks": serializer.serialize(rows),
+            "next_cursor": next_cursor,
+        },
+        etag=etag,
+    )
 
 
 @task_routes.route("/tasks")
 @task_routes.route("/tasks/")
 @login_required
 def get_user_tasks():
-    tasks = Task.get_accessible_tasks(current_user)
-    return jsonify([task.to_dict() for task in tasks])
+    """
+    Get tasks from every project the current user can access.
+
+    Optional filters: status (comma separated), assigned_to, due_after and
+    due_before (ISO dates). Passing limit and/or cursor pages the result and
+    returns {"tasks": [...], "next_cursor": ...} instead of a plain list.
+    fields= limits the keys of each task. Supports If-None-Match.
+    """
+    args = request.args
+    errors = {}
+    filters = {}
+
+    if args.get("status"):
+        statuses = [status.strip() for status in args["status"].split(",")]
+        invalid = [s for s in statuses if s not in Task.VALID_STATUSES]
+        if invalid:
+            errors["status"] = (
+                f"Status must be one of: {', '.join(Task.VALID_STATUSES)}"
+            )
+        filters["status"] = statuses
+    if args.get("assigned_to"):
+        try:
+            filters["assigned_to"] = int(args["assigned_to"])
+        except ValueError:
+            errors["assigned_to"] = "assigned_to must be a user id"
+    for key in ("due_after", "due_before"):
+        if args.get(key):
+            try:
+                filters[key] = parse_date_arg(args[key])
+            except ValueError:
+                errors[key] = f"{key} must be an ISO date"
+
+    if errors:
+        return {"message": "Validation error", "errors": errors}, 400
+
+    serializer = Selection.from_request(task_serializer).serializer(
+        task_serializer
+    )
+    tasks = Task.get_accessible_tasks(current_user, **filters)
+    return task_list_response(serializer, tasks)
 
 
 @task_routes.route("/tasks/<int:task_id>/toggle", methods=["PATCH"])
 @task_routes.route("/tasks/<int:task_id>/toggle/", methods=["PATCH"])
 @login_required
 @require_task_access
-def toggle_task_completion(task_id):
+def toggle_task_completion(task_id, task):
     try:
-        task = Task.query.get(task_id)
-        if not task:
-            return {"message": "Task couldn't be found"}, 404
-
         # Toggle between Completed and Not Started
         new_status = (
             "Completed" if task.status != "Completed" else "Not Started"
@@ -110,8 +143,8 @@ def toggle_task_completion(task_id):
     methods=["POST"],
 )
 @login_required
-@require_project_access
-def create_task(feature_id):
+@require_feature_access
+def create_task(project_id, feature_id, project, feature):
     """
     Create a new task for a feature
     """
@@ -152,16 +185,17 @@ def create_task(feature_id):
     "/projects/<int:project_id>/features/<int:feature_id>/tasks/<int:task_id>"
 )
 @login_required
-@require_project_access
-def get_task(feature_id, task_id):
+@require_feature_access
+def get_task(project_id, feature_id, task_id, project, feature):
     """
-    Get a specific task by ID
+    Get a specific task by ID. Supports fields=
     """
     task = Task.query.get(task_id)
     if not task or task.feature_id != feature_id:
         return {"message": "Task couldn't be found"}, 404
 
-    return jsonify(task.to_dict())
+    selection = Selection.from_request(task_serializer)
+    return jsonify(selection.trim(task.to_dict()))
 
 
 @task_routes.route(
@@ -173,8 +207,8 @@ def get_task(feature_id, task_id):
     methods=["PUT"],
 )
 @login_required
-@require_project_access
-def update_task(feature_id, task_id):
+@require_feature_access
+def update_task(project_id, feature_id, task_id, project, feature):
     """
     Update an existing task
     """
@@ -209,8 +243,8 @@ def update_task(feature_id, task_id):
     methods=["DELETE"],
 )
 @login_required
-@require_project_access
-def delete_task(feature_id, task_id):
+@require_feature_access
+def delete_task(project_id, feature_id, task_id, project, feature):
     """
     Delete an existing task
     """
@@ -222,3 +256,250 @@ def delete_task(feature_id, task_id):
         return {"message": "Successfully deleted"}, 200
     else:
         return {"message": "Delete failed"}, 400
+
+
+# Bulk endpoints. Each takes a list of items, checks the project once, looks
+# up everything the items reference with one query per table, applies the
+# valid items in set-based statements with a single commit and reports a
+# result per item (in request order) instead of failing the whole batch.
+
+MAX_BULK_TASKS = 500
+
+# API field name -> Task column attribute
+TASK_FIELDS = {
+    "feature_id": "feature_id",
+    "name": "name",
+    "description": "description",
+    "assigned_to": "assigned_to",
+    "status": "status",
+    "priority": "priority",
+    "start_date": "_start_date",
+    "due_date": "_due_date",
+}
+
+
+def bulk_items(key):
+    """
+    Returns the list under key in the request body, or an error response
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        error = f"{key} must be a non-empty list"
+    elif len(items) > MAX_BULK_TASKS:
+        error = f"At most {MAX_BULK_TASKS} {key} per request"
+    else:
+        return items, None
+    return None, ({"message": "Validation error", "errors": {key: error}}, 400)
+
+
+def is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def existing_ids(query, column, ids):
+    ids = {i for i in ids if is_id(i)}
+    if not ids:
+        return set()
+    query = query.filter(column.in_(ids)).with_entities(column)
+    return {row[0] for row in query}
+
+
+def task_values(item, feature_ids, user_ids):
+    """
+    Validates the task fields present in item and converts them to column
+    values. Returns (values, errors).
+    """
+    values = {}
+    errors = {}
+    for field, value in item.items():
+        if field == "id":
+            continue
+        if field not in TASK_FIELDS:
+            errors[field] = "Unknown field"
+            continue
+        if field in ("name", "description") and not (
+            isinstance(value, str) and value.strip()
+        ):
+            errors[field] = f"{field.capitalize()} is required"
+        elif field == "feature_id" and not (
+            is_id(value) and value in feature_ids
+        ):
+            errors[field] = "Feature couldn't be found in this project"
+        elif field == "assigned_to" and not (
+            value is None or (is_id(value) and value in user_ids)
+        ):
+            errors[field] = "User couldn't be found"
+        elif field == "status" and value not in Task.VALID_STATUSES:
+            errors[field] = (
+                f"Status must be one of: {', '.join(Task.VALID_STATUSES)}"
+            )
+        elif field == "priority" and not is_id(value):
+            errors[field] = "Priority must be an integer"
+        elif field in ("start_date", "due_date") and value is not None:
+            try:
+                value = parse_date_arg(value)
+            except (AttributeError, TypeError, ValueError):
+                # parse_date_arg expects a string; 123 or [] land here too
+                errors[field] = f"{field} must be an ISO date"
+        values[TASK_FIELDS[field]] = value
+    return values, errors
+
+
+def referenced(items, field):
+    return [item.get(field) for item in items if isinstance(item, dict)]
+
+
+def bulk_lookups(project_id, items):
+    feature_ids = existing_ids(
+        Feature.query.filter(Feature.project_id == project_id),
+        Feature.id,
+        referenced(items, "feature_id"),
+    )
+    user_ids = existing_ids(
+        User.query, User.id, referenced(items, "assigned_to")
+    )
+    return feature_ids, user_ids
+
+
+def tasks_by_id(ids):
+    query = Task.query.filter(Task.id.in_(ids))
+    return {task["id"]: task for task in task_serializer.all(query)}
+
+
+@task_routes.route("/projects/<int:project_id>/tasks/bulk", methods=["POST"])
+@login_required
+@require_project_access
+def bulk_create_tasks(project_id, project):
+    """
+    Create many tasks in one request: {"tasks": [{feature_id, name,
+    description, ...}, ...]}. Returns a result per task in request order.
+    """
+    items, error = bulk_items("tasks")
+    if error:
+        return error
+    feature_ids, user_ids = bulk_lookups(project_id, items)
+
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors = {"task": "Each task must be an object"}
+        else:
+            item = {"status": "Not Started", "priority": 0, **item}
+            values, errors = task_values(item, feature_ids, user_ids)
+            for field in ("feature_id", "name", "description"):
+                if field not in item:
+                    errors[field] = f"{field} is required"
+        if errors:
+            results.append({"index": index, "status": 400, "errors": errors})
+            continue
+        values["_created_by"] = current_user.id
+        rows.append(values)
+        results.append({"index": index, "status": 201})
+
+    if rows:
+        new_ids = Task.create_tasks(rows)
+        created = tasks_by_id(new_ids)
+        new_ids = iter(new_ids)
+        for result in results:
+            if result["status"] == 201:
+                result["task"] = created[next(new_ids)]
+    return json_response({"results": results})
+
+
+@task_routes.route("/projects/<int:project_id>/tasks/bulk", methods=["PATCH"])
+@login_required
+@require_project_access
+def bulk_update_tasks(project_id, project):
+    """
+    Update many tasks in one request: {"tasks": [{id, ...fields}, ...]}.
+    Tasks receiving identical changes share one UPDATE statement.
+    """
+    items, error = bulk_items("tasks")
+    if error:
+        return error
+    feature_ids, user_ids = bulk_lookups(project_id, items)
+    task_ids = existing_ids(
+        Task.query.join(Feature).filter(Feature.project_id == project_id),
+        Task.id,
+        referenced(items, "id"),
+    )
+
+    results = []
+    changes = {}
+    seen = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors = {"task": "Each task must be an object"}
+        elif not (is_id(item.get("id")) and item["id"] in task_ids):
+            results.append(
+                {
+                    "index": index,
+                    "id": item.get("id"),
+                    "status": 404,
+                    "errors": {"id": "Task couldn't be found"},
+                }
+            )
+            continue
+        elif item["id"] in seen:
+            errors = {"id": "Task appears more than once"}
+        else:
+            values, errors = task_values(item, feature_ids, user_ids)
+        if errors:
+            results.append({"index": index, "status": 400, "errors": errors})
+            continue
+        seen.add(item["id"])
+        if values:
+            key = tuple(sorted(values.items()))
+            changes.setdefault(key, []).append(item["id"])
+        results.append({"index": index, "id": item["id"], "status": 200})
+
+    updated_ids = [r["id"] for r in results if r["status"] == 200]
+    if changes:
+        Task.update_tasks(
+            [(ids, dict(values)) for values, ids in changes.items()],
+            project_id,
+        )
+    if updated_ids:
+        updated = tasks_by_id(updated_ids)
+        for result in results:
+            if result["status"] == 200:
+                result["task"] = updated[result["id"]]
+    return json_response({"results": results})
+
+
+@task_routes.route(
+    "/projects/<int:project_id>/tasks/bulk", methods=["DELETE"]
+)
+@login_required
+@require_project_access
+def bulk_delete_tasks(project_id, project):
+    """
+    Delete many tasks in one request: {"ids": [1, 2, ...]}
+    """
+    ids, error = bulk_items("ids")
+    if error:
+        return error
+    task_ids = existing_ids(
+        Task.query.join(Feature).filter(Feature.project_id == project_id),
+        Task.id,
+        ids,
+    )
+
+    results = []
+    for index, task_id in enumerate(ids):
+        if is_id(task_id) and task_id in task_ids:
+            results.append({"index": index, "id": task_id, "status": 200})
+        else:
+            results.append(
+                {
+                    "index": index,
+                    "id": task_id,
+                    "status": 404,
+                    "errors": {"id": "Task couldn't be found"},
+                }
+            )
+    if task_ids:
+        Task.delete_tasks(task_ids, project_id)
+    return json_response({"results": results})
@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify
-from flask_login import login_required, current_user
-from models import User, Project
+from flask_login import login_required
+from models import User
+from ..authorization import require_project_access
+from ..pagination import Pagination
 
 user_routes = Blueprint("users", __name__)
 
@@ -9,8 +11,16 @@ user_routes = Blueprint("users", __name__)
 @user_routes.route("/users/")
 @login_required
 def get_all_users():
-    users = User.query.all()
-    return {"users": [user.to_dict() for user in users]}
+    page = Pagination.from_request()
+    if not page:
+        return {"users": [user.to_dict() for user in User.query.all()]}
+    users, next_cursor = page.paginate(
+        User.query, User.id, sort_column=User.username
+    )
+    return {
+        "users": [user.to_dict() for user in users],
+        "next_cursor": next_cursor,
+    }
 
 
 @user_routes.route("/users/<int:id>")
@@ -25,18 +35,9 @@ def user(id):
 
 @user_routes.route("/projects/<int:project_id>/users")
 @login_required
-def project_users(project_id):
-    project = Project.query.get(project_id)
-
-    # Check if project exists
-    if not project:
-        return {"errors": {"message": "Project couldn't be found"}}, 404
-
-    # Check authorization
-    if not current_user.has_project_access(project_id):
-        return {"errors": {"message": "Unauthorized"}}, 403
-
-    # If authorized, return project users
+@require_project_access
+def project_users(project_id, project):
+    # Return project users
     users = [
         user.to_dict() for user in project.users
     ]  # Changed from members to users
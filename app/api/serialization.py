@@ -0,0 +1,308 @@
+"""
+Columnar serialization for read-only list endpoints.
+
+Instead of hydrating ORM instances and calling to_dict() on each, the
+serializers below select only the columns they emit as plain row tuples
+and build dicts directly. Datetimes are left as-is for the JSON encoder:
+orjson (when installed) formats them natively, otherwise the stdlib
+encoder falls back to isoformat(), so the output matches to_dict().
+"""
+import json
+from datetime import date
+from flask import Response, request
+from models import Feature, Project, Sprint, Task
+from .conditional import set_validators
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """
+    Encodes payload as JSON bytes with the fastest available backend
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(
+        payload, default=_default, separators=(",", ":")
+    ).encode()
+
+
+def json_response(payload, status=200, etag=None):
+    response = Response(
+        dumps(payload), status=status, mimetype="application/json"
+    )
+    if etag is not None:
+        set_validators(response, etag)
+    return response
+
+
+def duration_string(start, end):
+    # Same rules as Task.duration / Sprint.duration and their to_dict()
+    if not (start and end):
+        return None
+    difference = end - start
+    total_hours = difference.days * 24 + difference.seconds / 3600
+    if total_hours >= 12:
+        duration = int((total_hours + 12) // 24)
+    else:
+        duration = int(total_hours)
+    unit = "day" if duration == 1 else "days" if duration >= 12 else "hours"
+    return f"{duration} {unit}"
+
+
+class SelectionError(ValueError):
+    def __init__(self, errors):
+        super().__init__("Invalid fields/include parameters")
+        self.errors = errors
+
+
+class RowSerializer:
+    """
+    Serializes a query as dicts of selected columns.
+
+    fields maps output keys to model columns; computed maps output keys to
+    (function of the built row dict, keys the function reads). hidden keys
+    are selected for computed values or callers but left out of the output.
+    """
+
+    def __init__(self, fields, computed=None, hidden=()):
+        self.fields = fields
+        self.computed = computed or {}
+        self.hidden = tuple(hidden)
+        self.keys = list(fields)
+
+    @property
+    def available(self):
+        return set(self.fields) | set(self.computed)
+
+    def only(self, fields, required=("id",), select=()):
+        """
+        Returns a serializer emitting just fields plus required, selecting
+        only the columns those need. select names extra columns to fetch
+        without emitting them (e.g. a sort key for pagination).
+        """
+        if fields is None:
+            return self
+        wanted = set(fields) | set(required)
+        columns = wanted | set(select)
+        for key, (_, reads) in self.computed.items():
+            if key in wanted:
+                columns.update(reads)
+        return RowSerializer(
+            {k: c for k, c in self.fields.items() if k in columns},
+            {k: v for k, v in self.computed.items() if k in wanted},
+            hidden=[k for k in self.fields if k in columns - wanted],
+        )
+
+    def entities(self):
+        return [column.label(key) for key, column in self.fields.items()]
+
+    def query(self, query):
+        """
+        Narrows an ORM query to this serializer's columns
+        """
+        return query.with_entities(*self.entities())
+
+    def serialize(self, rows):
+        keys = self.keys
+        items = [dict(zip(keys, row)) for row in rows]
+        for key, (compute, _) in self.computed.items():
+            for item in items:
+                item[key] = compute(item)
+        for key in self.hidden:
+            for item in items:
+                del item[key]
+        return items
+
+    def all(self, query):
+        return self.serialize(self.query(query))
+
+
+task_serializer = RowSerializer(
+    {
+        "id": Task.id,
+        "feature_id": Task.feature_id,
+        "name": Task.name,
+        "description": Task.description,
+        "created_by": Task._created_by,
+        "assigned_to": Task.assigned_to,
+        "status": Task.status,
+        "priority": Task.priority,
+        "start_date": Task._start_date,
+        "due_date": Task._due_date,
+        "created_at": Task.created_at,
+        "updated_at": Task.updated_at,
+    },
+    computed={
+        "duration": (
+            lambda row: duration_string(row["start_date"], row["due_date"]),
+            ("start_date", "due_date"),
+        )
+    },
+)
+
+sprint_serializer = RowSerializer(
+    {
+        "id": Sprint.id,
+        "project_id": Sprint.project_id,
+        "name": Sprint.name,
+        "start_date": Sprint._start_date,
+        "end_date": Sprint._end_date,
+        "created_at": Sprint.created_at,
+        "updated_at": Sprint.updated_at,
+    },
+    computed={
+        "duration": (
+            lambda row: duration_string(row["start_date"], row["end_date"]),
+            ("start_date", "end_date"),
+        )
+    },
+)
+
+feature_serializer = RowSerializer(
+    {
+        "id": Feature.id,
+        "project_id": Feature.project_id,
+        "sprint_id": Feature.sprint_id,
+        "name": Feature.name,
+        "description": Feature.description,
+        "status": Feature.status,
+        "priority": Feature.priority,
+        "created_at": Feature.created_at,
+        "updated_at": Feature.updated_at,
+    }
+)
+
+
+project_serializer = RowSerializer(
+    {
+        "id": Project.id,
+        "name": Project.name,
+        "description": Project.description,
+        "owner_id": Project.owner_id,
+        "due_date": Project.due_date,
+        "created_at": Project.created_at,
+        "updated_at": Project.updated_at,
+    }
+)
+
+
+class Selection:
+    """
+    The fields= and include= query parameters of a read endpoint.
+
+    fields limits the keys of each item (id is always kept). include names
+    the nested expansions to embed. Without include, the endpoint's default
+    expansions are embedded unless fields leaves them out, so existing
+    clients keep their payloads while ?fields=name,status stays small.
+    """
+
+    def __init__(self, fields=None, include=()):
+        self.fields = fields
+        self.include = set(include)
+
+    @staticmethod
+    def _parse(name):
+        if name not in request.args:
+            return None
+        return [v.strip() for v in request.args[name].split(",") if v.strip()]
+
+    @classmethod
+    def from_request(cls, serializer, expansions=(), defaults=()):
+        fields = cls._parse("fields")
+        include = cls._parse("include")
+        errors = {}
+        if fields is not None:
+            unknown = set(fields) - serializer.available - set(expansions)
+            if unknown:
+                errors["fields"] = (
+                    f"Unknown field(s): {', '.join(sorted(unknown))}"
+                )
+        if include is not None:
+            unknown = set(include) - set(expansions)
+            if unknown:
+                errors["include"] = (
+                    f"Can't include: {', '.join(sorted(unknown))}. "
+                    f"Available: {', '.join(expansions) or 'none'}"
+                )
+        if errors:
+            raise SelectionError(errors)
+
+        if include is None:
+            include = [e for e in defaults if fields is None or e in fields]
+        if fields is not None:
+            fields = [field for field in fields if field not in expansions]
+        return cls(fields, include)
+
+    def includes(self, expansion):
+        return expansion in self.include
+
+    def serializer(self, serializer, required=("id",), select=()):
+        return serializer.only(self.fields, required, select)
+
+    def trim(self, item, required=("id",)):
+        """
+        Applies the selection to a dict built by a model's to_dict()
+        """
+        if self.fields is None:
+            return item
+        keep = set(self.fields) | set(required) | self.include
+        return {key: value for key, value in item.items() if key in keep}
+
+
+def keyed(items):
+    """
+    Normalizes a list of dicts into {id: item}. Keys are strings, as JSON
+    object keys must be.
+    """
+    return {str(item["id"]): item for item in items}
+
+
+def attach_tasks(features, task_query):
+    """
+    Nests the rows of task_query under their features as "tasks", matching
+    Feature.to_dict(). One query for all features.
+    """
+    by_feature = {feature["id"]: feature for feature in features}
+    for feature in features:
+        feature["tasks"] = []
+    for task in task_serializer.all(task_query.order_by(Task.id)):
+        feature = by_feature.get(task["feature_id"])
+        if feature is not None:
+            feature["tasks"].append(task)
+    return features
+
+
+def attach_sprints(features):
+    """
+    Nests each feature's sprint as "sprint" (None for the backlog) with one
+    query for all of them
+    """
+    sprint_ids = {f["sprint_id"] for f in features if f.get("sprint_id")}
+    sprints = {}
+    if sprint_ids:
+        query = Sprint.query.filter(Sprint.id.in_(sprint_ids))
+        rows = sprint_serializer.all(query)
+        sprints = {sprint["id"]: sprint for sprint in rows}
+    for feature in features:
+        feature["sprint"] = sprints.get(feature.get("sprint_id"))
+    return features
+
+
+def attach_members(projects):
+    """
+    Adds the member user ids of each project as "members"
+    """
+    members = Project.get_members_by_project([p["id"] for p in projects])
+    for project in projects:
+        project["members"] = members[project["id"]]
+    return projects
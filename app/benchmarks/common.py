@@ -0,0 +1,52 @@
+import importlib
+import os
+import statistics
+import tempfile
+
+
+def load_app(database_url=None):
+    """
+    Imports the Flask app against database_url, defaulting to a throwaway
+    SQLite file so a benchmark never touches a real database by accident.
+    Must be called from the app directory, like the commands in init.sh.
+    """
+    if database_url is None:
+        fd, path = tempfile.mkstemp(prefix="taskflow-bench-", suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    app = importlib.import_module("__init__").app
+
+    from models import db
+
+    with app.app_context():
+        db.engine.echo = False
+    return app
+
+
+def percentiles(seconds):
+    """
+    p50/p95/p99 in milliseconds of a list of durations in seconds
+    """
+    if len(seconds) < 2:
+        value = round(seconds[0] * 1000, 2) if seconds else None
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(seconds, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+def seed_dataset(**sizes):
+    """
+    Creates the schema and fills it with `flask seed scale` data (see
+    seeds/scale.py), quietly. Returns the row counts.
+    """
+    from models import db
+    from seeds.scale import seed_scale
+
+    db.create_all()
+    return seed_scale(log=lambda message: None, **sizes)
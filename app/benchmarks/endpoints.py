@@ -0,0 +1,718 @@
+"""
+Latency percentiles, throughput and SQL statement counts per endpoint.
+
+Run from the app directory:
+
+    python -m benchmarks.endpoints --requests 3000 --output before.json
+    python -m benchmarks.endpoints --requests 3000 --baseline before.json
+    python -m benchmarks.endpoints --http --workers 4 --clients 4
+    python -m benchmarks.endpoints --database-url postgresql://... --reuse
+
+Seeds the database with `flask seed scale` data, then has a power user
+replay a weighted mix of board reads and write workflows that covers every
+API route. Requests go through the Flask test client in this process by
+default. With --http, gunicorn serves the app instead (see
+benchmarks/serving.py) and --clients processes drive it. Statement counts
+come from the X-Query-Count header.
+
+API endpoints that no scenario covers are listed under not_covered, so new
+routes don't silently go unmeasured. With --baseline, each endpoint also
+gets its change against a previous run's output. Without --reuse the
+database contents are replaced, so point --database-url at a scratch
+database only.
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from .common import load_app, percentiles, seed_dataset
+from .serving import start_server
+
+PASSWORD = "password"
+# Routes deliberately left out of the mix
+EXCLUDED = {
+    "api.projects.project_event_stream": "long-lived event stream",
+}
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, url, body=None):
+        started = time.perf_counter()
+        response = self.client.open(url, method=method, json=body)
+        data = response.get_data()
+        elapsed = time.perf_counter() - started
+        queries = response.headers.get("X-Query-Count")
+        return response.status_code, data, queries, elapsed
+
+
+class HTTPTransport:
+    """
+    One keep-alive connection with its own cookie jar
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.connection = http.client.HTTPConnection(
+            "127.0.0.1", port, timeout=30
+        )
+        self.cookies = {}
+
+    def request(self, method, url, body=None):
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{name}={value}" for name, value in self.cookies.items()
+            )
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, url, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return 0, b"", None, time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        for name, value in response.getheaders():
+            if name.lower() == "set-cookie":
+                cookie, _, value = value.split(";")[0].partition("=")
+                self.cookies[cookie] = value
+        queries = response.getheader("X-Query-Count")
+        return response.status, data, queries, elapsed
+
+
+class Session:
+    """
+    A logged in (or anonymous) client that records every request it makes
+    under the Flask endpoint it exercises
+    """
+
+    def __init__(self, new_transport, samples):
+        self.new_transport = new_transport
+        self.transport = new_transport()
+        self.samples = samples
+
+    def spawn(self):
+        return Session(self.new_transport, self.samples)
+
+    def call(self, endpoint, method, url, body=None, expect=200):
+        status, data, queries, elapsed = self.transport.request(
+            method, url, body
+        )
+        ok = status == expect
+        self.samples.append(
+            (endpoint, method, elapsed, ok, int(queries or 0))
+        )
+        if not ok:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def login(self, email):
+        self.call("api.auth.authenticate", "GET", "/api/auth/", expect=401)
+        user = self.call(
+            "api.auth.login",
+            "POST",
+            "/api/auth/login",
+            {"email": email, "password": PASSWORD},
+        )
+        if user is None:
+            raise RuntimeError(f"could not log in as {email}")
+
+
+def build_context(user_id=1, projects=40, tasks_per_project=200):
+    """
+    Ids the scenarios draw from: the projects the user can access with
+    their features, sprints and a sample of their tasks
+    """
+    from models import db, Feature, ProjectAccess, Sprint, Task, User
+
+    project_ids = [
+        project_id
+        for project_id, in db.session.query(ProjectAccess.project_id)
+        .filter(ProjectAccess.user_id == user_id)
+        .order_by(ProjectAccess.project_id)
+        .limit(projects)
+    ]
+    if not project_ids:
+        raise RuntimeError(f"user {user_id} has no projects to benchmark")
+    boards = []
+    for project_id in project_ids:
+        features = [
+            feature_id
+            for feature_id, in db.session.query(Feature.id).filter(
+                Feature.project_id == project_id
+            )
+        ]
+        sprints = [
+            sprint_id
+            for sprint_id, in db.session.query(Sprint.id).filter(
+                Sprint.project_id == project_id
+            )
+        ]
+        tasks = [
+            list(row)
+            for row in db.session.query(Task.id, Task.feature_id)
+            .join(Feature)
+            .filter(Feature.project_id == project_id)
+            .limit(tasks_per_project)
+        ]
+        if features and sprints and tasks:
+            boards.append(
+                {
+                    "id": project_id,
+                    "features": features,
+                    "sprints": sprints,
+                    "tasks": tasks,
+                }
+            )
+    user_ids = [user_id for user_id, in db.session.query(User.id).limit(500)]
+    return {
+        "user_id": user_id,
+        "email": db.session.get(User, user_id).email,
+        "other_user_id": next(u for u in user_ids if u != user_id),
+        "user_ids": user_ids,
+        "projects": boards,
+        # Changes polls ask for what the benchmark itself changed
+        "since": datetime.utcnow().isoformat(),
+    }
+
+
+def task_path(project, task_id, feature_id):
+    return (
+        f"/api/projects/{project['id']}/features/{feature_id}/tasks/{task_id}"
+    )
+
+
+# Reads, weighted roughly as a board UI issues them
+
+READS = [
+    (10, "api.projects.get_all_projects", lambda c, p, r: "/api/projects"),
+    (
+        8,
+        "api.projects.get_project",
+        lambda c, p, r: f"/api/projects/{p['id']}",
+    ),
+    (
+        10,
+        "api.features.get_all_features",
+        lambda c, p, r: f"/api/projects/{p['id']}/features",
+    ),
+    (
+        5,
+        "api.features.get_feature",
+        lambda c, p, r: f"/api/projects/{p['id']}/features/"
+        f"{r.choice(p['features'])}",
+    ),
+    (
+        6,
+        "api.sprints.get_all_sprints_project",
+        lambda c, p, r: f"/api/projects/{p['id']}/sprints",
+    ),
+    (
+        3,
+        "api.sprints.get_single_sprint",
+        lambda c, p, r: f"/api/projects/{p['id']}/sprints/"
+        f"{r.choice(p['sprints'])}",
+    ),
+    (
+        10,
+        "api.tasks.get_all_tasks_feature",
+        lambda c, p, r: f"/api/projects/{p['id']}/features/"
+        f"{r.choice(p['features'])}/tasks",
+    ),
+    (
+        5,
+        "api.tasks.get_task",
+        lambda c, p, r: task_path(p, *r.choice(p["tasks"])),
+    ),
+    (
+        5,
+        "api.tasks.get_user_tasks",
+        lambda c, p, r: r.choice(
+            ["/api/tasks?limit=50", "/api/tasks?limit=50&status=In%20Progress"]
+        ),
+    ),
+    (
+        4,
+        "api.projects.get_project_summary",
+        lambda c, p, r: f"/api/projects/{p['id']}/summary",
+    ),
+    (
+        2,
+        "api.projects.get_project_snapshot",
+        lambda c, p, r: f"/api/projects/{p['id']}/snapshot",
+    ),
+    (
+        4,
+        "api.projects.get_project_changes",
+        lambda c, p, r: f"/api/projects/{p['id']}/changes?since={c['since']}",
+    ),
+    (
+        3,
+        "api.users.project_users",
+        lambda c, p, r: f"/api/projects/{p['id']}/users",
+    ),
+    (2, "api.users.get_all_users", lambda c, p, r: "/api/users?limit=50"),
+    (
+        2,
+        "api.users.user",
+        lambda c, p, r: f"/api/users/{r.choice(c['user_ids'])}",
+    ),
+    (3, "api.auth.authenticate", lambda c, p, r: "/api/auth/"),
+]
+
+
+def read(endpoint, url):
+    def scenario(session, ctx, rng):
+        project = rng.choice(ctx["projects"])
+        session.call(endpoint, "GET", url(ctx, project, rng))
+
+    return scenario
+
+
+# Write workflows clean up after themselves, leaving the seeded data as
+# it was
+
+
+def task_workflow(session, ctx, rng):
+    project = rng.choice(ctx["projects"])
+    base = (
+        f"/api/projects/{project['id']}/features/"
+        f"{rng.choice(project['features'])}/tasks"
+    )
+    task = session.call(
+        "api.tasks.create_task",
+        "POST",
+        base,
+        {
+            "name": "Benchmark task",
+            "description": "Created by the endpoint benchmark",
+            "assigned_to": ctx["user_id"],
+        },
+        expect=201,
+    )
+    if task is None:
+        return
+    url = f"{base}/{task['id']}"
+    session.call(
+        "api.tasks.update_task",
+        "PUT",
+        url,
+        {"name": "Benchmark task (edited)", "priority": 2},
+    )
+    session.call(
+        "api.tasks.toggle_task_completion",
+        "PATCH",
+        f"/api/tasks/{task['id']}/toggle",
+    )
+    session.call("api.tasks.delete_task", "DELETE", url)
+
+
+def bulk_task_workflow(session, ctx, rng):
+    project = rng.choice(ctx["projects"])
+    feature_id = rng.choice(project["features"])
+    url = f"/api/projects/{project['id']}/tasks/bulk"
+    created = session.call(
+        "api.tasks.bulk_create_tasks",
+        "POST",
+        url,
+        {
+            "tasks": [
+                {
+                    "feature_id": feature_id,
+                    "name": f"Benchmark bulk task {number}",
+                    "description": "Created by the endpoint benchmark",
+                }
+                for number in range(20)
+            ]
+        },
+    )
+    if created is None:
+        return
+    ids = [r["task"]["id"] for r in created["results"] if "task" in r]
+    session.call(
+        "api.tasks.bulk_update_tasks",
+        "PATCH",
+        url,
+        {"tasks": [{"id": i, "status": "In Progress"} for i in ids]},
+    )
+    session.call("api.tasks.bulk_delete_tasks", "DELETE", url, {"ids": ids})
+
+
+def feature_workflow(session, ctx, rng):
+    project = rng.choice(ctx["projects"])
+    base = f"/api/projects/{project['id']}/features"
+    feature = session.call(
+        "api.features.create_feature",
+        "POST",
+        base,
+        {"name": "Benchmark feature"},
+        expect=201,
+    )
+    if feature is None:
+        return
+    url = f"{base}/{feature['id']}"
+    session.call(
+        "api.features.update_feature",
+        "PUT",
+        url,
+        {"name": "Benchmark feature (edited)", "status": "In Progress"},
+    )
+    session.call("api.features.delete_feature", "DELETE", url, expect=204)
+
+
+def sprint_workflow(session, ctx, rng):
+    project = rng.choice(ctx["projects"])
+    base = f"/api/projects/{project['id']}"
+    sprints = [
+        session.call(
+            "api.sprints.create_sprint",
+            "POST",
+            f"{base}/sprints",
+            {"name": f"Benchmark sprint {number}"},
+            expect=201,
+        )
+        for number in (1, 2)
+    ]
+    feature = session.call(
+        "api.features.create_feature",
+        "POST",
+        f"{base}/features",
+        {"name": "Benchmark sprint feature"},
+        expect=201,
+    )
+    if None not in sprints and feature is not None:
+        first, second = (f"{base}/sprints/{s['id']}" for s in sprints)
+        session.call(
+            "api.sprints.assign_features",
+            "POST",
+            f"{first}/features",
+            {"feature_ids": [feature["id"]]},
+        )
+        session.call(
+            "api.sprints.roll_over_sprint",
+            "POST",
+            f"{first}/rollover",
+            {"to_sprint_id": sprints[1]["id"]},
+        )
+        session.call(
+            "api.sprints.update_sprint",
+            "PUT",
+            second,
+            {"name": "Benchmark sprint (edited)"},
+        )
+    if feature is not None:
+        session.call(
+            "api.features.delete_feature",
+            "DELETE",
+            f"{base}/features/{feature['id']}",
+            expect=204,
+        )
+    for sprint in sprints:
+        if sprint is not None:
+            session.call(
+                "api.sprints.delete_sprint",
+                "DELETE",
+                f"{base}/sprints/{sprint['id']}",
+            )
+
+
+def project_workflow(session, ctx, rng):
+    values = {
+        "name": "Benchmark project",
+        "description": "Created by the endpoint benchmark",
+        "due_date": (date.today() + timedelta(days=30)).isoformat(),
+    }
+    project = session.call(
+        "api.projects.create_project",
+        "POST",
+        "/api/projects",
+        values,
+        expect=201,
+    )
+    if project is None:
+        return
+    url = f"/api/projects/{project['id']}"
+    # The JSON update path stores due_date as given, so leave it out
+    session.call(
+        "api.projects.update_project",
+        "PUT",
+        url,
+        {
+            "name": "Benchmark project (edited)",
+            "description": "Edited by the endpoint benchmark",
+        },
+    )
+    member = f"{url}/members/{ctx['other_user_id']}"
+    session.call("api.projects.add_project_member", "POST", member)
+    session.call("api.projects.remove_project_member", "DELETE", member)
+    session.call("api.projects.delete_project_route", "DELETE", url)
+
+
+def auth_workflow(session, ctx, rng):
+    # A separate client, so the benchmark user stays logged in
+    visitor = session.spawn()
+    visitor.call(
+        "api.auth.unauthorized", "GET", "/api/auth/unauthorized", expect=401
+    )
+    visitor.call("api.auth.authenticate", "GET", "/api/auth/", expect=401)
+    name = f"bench{uuid.uuid4().hex[:12]}"
+    email = f"{name}@example.com"
+    visitor.call(
+        "api.auth.sign_up",
+        "POST",
+        "/api/auth/signup",
+        {
+            "username": name,
+            "email": email,
+            "first_name": "Bench",
+            "last_name": "Visitor",
+            "password": PASSWORD,
+        },
+    )
+    visitor.call("api.auth.logout", "GET", "/api/auth/logout")
+    visitor.call(
+        "api.auth.login",
+        "POST",
+        "/api/auth/login",
+        {"email": email, "password": PASSWORD},
+    )
+
+
+SCENARIOS = [(weight, read(e, url)) for weight, e, url in READS] + [
+    (4, task_workflow),
+    (1, bulk_task_workflow),
+    (2, feature_workflow),
+    (1, sprint_workflow),
+    (1, project_workflow),
+    (1, auth_workflow),
+]
+
+
+def drive(session, ctx, requests, seed):
+    """
+    Runs scenarios picked by weight until at least `requests` requests
+    have been recorded
+    """
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in SCENARIOS]
+    scenarios = [scenario for _, scenario in SCENARIOS]
+    target = len(session.samples) + requests
+    while len(session.samples) < target:
+        rng.choices(scenarios, weights)[0](session, ctx, rng)
+
+
+def http_client(port, ctx, requests, seed):
+    """
+    One load generator process for --http. Returns its samples.
+    """
+    session = Session(lambda: HTTPTransport(port), [])
+    session.login(ctx["email"])
+    session.samples.clear()
+    drive(session, ctx, requests, seed)
+    return session.samples
+
+
+def summarize(samples, elapsed):
+    grouped = {}
+    for endpoint, method, seconds, ok, queries in samples:
+        entry = grouped.setdefault(
+            endpoint, {"method": method, "times": [], "queries": []}
+        )
+        entry["times"].append(seconds)
+        entry["queries"].append(queries)
+        entry["errors"] = entry.get("errors", 0) + (not ok)
+
+    endpoints = {}
+    for endpoint, entry in sorted(grouped.items()):
+        times, queries = entry["times"], entry["queries"]
+        endpoints[endpoint] = {
+            "method": entry["method"],
+            "requests": len(times),
+            "errors": entry["errors"],
+            **percentiles(times),
+            "mean_ms": round(sum(times) * 1000 / len(times), 2),
+            "queries_mean": round(sum(queries) / len(queries), 2),
+            "queries_max": max(queries),
+        }
+    return {
+        "requests": len(samples),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "seconds": round(elapsed, 2),
+        "requests_per_sec": round(len(samples) / elapsed, 1),
+        **percentiles([seconds for _, _, seconds, _, _ in samples]),
+        "endpoints": endpoints,
+    }
+
+
+def compare(endpoints, baseline):
+    """
+    Per-endpoint change against a previous run: latency in percent,
+    statements per request as a difference
+    """
+    changes = {}
+    for endpoint, now in endpoints.items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        change = {}
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if before.get(key):
+                change[f"{key}_pct"] = round(
+                    (now[key] - before[key]) * 100 / before[key], 1
+                )
+        change["queries_mean_diff"] = round(
+            now["queries_mean"] - before["queries_mean"], 2
+        )
+        changes[endpoint] = change
+    return changes
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url")
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="benchmark the data already in --database-url",
+    )
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks-per-feature", type=int, default=25)
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=2000,
+        help="measured requests (per client with --http)",
+    )
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--http", action="store_true")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--port", type=int, default=5078)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--baseline", help="report from an earlier run")
+    args = parser.parse_args()
+
+    # Keep background work out of the measurements
+    os.environ.setdefault("OVERDUE_SWEEP_INTERVAL", "0")
+    os.environ["SQL_TIMING_HEADERS"] = "true"
+    app = load_app(args.database_url)
+    from models import db
+
+    with app.app_context():
+        dataset = None
+        if not args.reuse:
+            dataset = seed_dataset(
+                users=args.users,
+                projects=args.projects,
+                tasks_per_feature=args.tasks_per_feature,
+                seed=args.seed,
+            )
+        ctx = build_context()
+        db.session.remove()
+
+    if args.http:
+        env = {
+            **os.environ,
+            "GUNICORN_ACCESS_LOG": "",
+            "GUNICORN_LOG_LEVEL": "warning",
+        }
+        server = start_server(args.port, args.workers, args.threads, env)
+        try:
+            http_client(args.port, ctx, args.warmup, args.seed)
+            with multiprocessing.Pool(args.clients) as pool:
+                started = time.perf_counter()
+                results = pool.starmap(
+                    http_client,
+                    [
+                        (args.port, ctx, args.requests, args.seed + n)
+                        for n in range(1, args.clients + 1)
+                    ],
+                )
+                elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+        samples = [sample for result in results for sample in result]
+        mode = {
+            "mode": "http",
+            "workers": args.workers,
+            "threads": args.threads,
+            "clients": args.clients,
+        }
+    else:
+        session = Session(lambda: TestClientTransport(app), [])
+        # Some views print debug output; keep stdout for the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(
+            devnull
+        ):
+            session.login(ctx["email"])
+            drive(session, ctx, args.warmup, args.seed)
+            session.samples.clear()
+            started = time.perf_counter()
+            drive(session, ctx, args.requests, args.seed + 1)
+            elapsed = time.perf_counter() - started
+        samples = session.samples
+        mode = {"mode": "test_client"}
+
+    report = {
+        "commit": git_commit(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":")[0],
+        **mode,
+        "dataset": dataset,
+        **summarize(samples, elapsed),
+    }
+    measured = set(report["endpoints"])
+    report["not_covered"] = sorted(
+        {
+            rule.endpoint
+            for rule in app.url_map.iter_rules()
+            if rule.endpoint.startswith("api.")
+            and rule.endpoint not in measured
+            and rule.endpoint not in EXCLUDED
+        }
+    )
+    report["excluded"] = EXCLUDED
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["changes"] = compare(report["endpoints"], json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
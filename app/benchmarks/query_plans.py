@@ -0,0 +1,165 @@
+"""
+Query plans and timings for the hot queries with and without the indexes
+added in migration 3f2a9c1d7b42. Indexes from later migrations stay in
+place for both runs.
+
+Run from the app directory:
+
+    python -m benchmarks.query_plans --tasks-per-feature 20
+    python -m benchmarks.query_plans --database-url postgresql://...
+
+The database is filled with synthetic rows, so point --database-url at a
+scratch database only.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import time
+from types import SimpleNamespace
+from .common import load_app, seed_dataset
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def migration_indexes():
+    """
+    The (name, table, columns) list of the indexes migration 3f2a9c1d7b42
+    adds
+    """
+    path = os.path.join(
+        APP_DIR,
+        "migrations",
+        "versions",
+        "3f2a9c1d7b42_add_foreign_key_and_filter_indexes.py",
+    )
+    spec = importlib.util.spec_from_file_location("migration_3f2a", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration.INDEXES
+
+
+def hot_queries(user_id, project_id, feature_id):
+    from models import Project, Feature, Sprint, Task
+
+    user = SimpleNamespace(id=user_id)
+    return {
+        "projects for user": Project.get_all_projects(user_id),
+        "features by project": Feature.get_features_by_project(project_id),
+        "sprints by project": Sprint.get_all_sprints_for_project(project_id),
+        "tasks by feature": Task.get_all_tasks_for_feature(feature_id),
+        "tasks by feature and status": Task.query.filter_by(
+            feature_id=feature_id, status="In Progress"
+        ),
+        "accessible tasks": Task.get_accessible_tasks(user).limit(50),
+        "assigned tasks by due date": Task.query.filter(
+            Task.assigned_to == user_id
+        )
+        .order_by(Task._due_date)
+        .limit(50),
+        "tasks created by user": Task.query.filter(
+            Task._created_by == user_id
+        ),
+    }
+
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", params
+        )
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN ANALYZE {compiled}", params)
+    return [row[0] for row in rows]
+
+
+def time_query(query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query.all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def measure(queries, repeat):
+    from models import db
+
+    connection = db.session.connection()
+    return {
+        name: {
+            "plan": explain(connection, query.statement),
+            "median_ms": time_query(query, repeat),
+        }
+        for name, query in queries.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--features-per-project", type=int, default=20)
+    parser.add_argument("--tasks-per-feature", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+    from models import db, Feature
+
+    with app.app_context():
+        counts = seed_dataset(
+            users=args.users,
+            projects=args.projects,
+            features_per_project=args.features_per_project,
+            tasks_per_feature=args.tasks_per_feature,
+        )
+        names = {name for name, _, _ in migration_indexes()}
+        # Later migrations replaced some of them; those are left out
+        indexes = [
+            index
+            for table in db.metadata.sorted_tables
+            for index in table.indexes
+            if index.name in names
+        ]
+        project_id = max(1, args.projects // 2)
+        feature_id = (
+            db.session.query(db.func.min(Feature.id))
+            .filter(Feature.project_id == project_id)
+            .scalar()
+        )
+        # User 1 is the busiest user in the seeded data
+        queries = hot_queries(
+            user_id=1, project_id=project_id, feature_id=feature_id
+        )
+
+        for index in indexes:
+            index.drop(db.session.connection())
+        db.session.execute(db.text("ANALYZE"))
+        before = measure(queries, args.repeat)
+
+        for index in indexes:
+            index.create(db.session.connection())
+        db.session.execute(db.text("ANALYZE"))
+        after = measure(queries, args.repeat)
+        db.session.commit()
+
+    report = {
+        "dataset": counts,
+        "queries": {
+            name: {"before": before[name], "after": after[name]}
+            for name in queries
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
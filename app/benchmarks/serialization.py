@@ -0,0 +1,75 @@
+"""
+Rows/sec of the ORM to_dict() path against the columnar serializers.
+
+Run from the app directory:
+
+    python -m benchmarks.serialization --tasks 10000
+"""
+import argparse
+import json
+import time
+from .common import load_app, seed_dataset
+
+
+def run(fn, repeat):
+    from models import db
+
+    best = None
+    for _ in range(repeat):
+        db.session.remove()  # start from an empty identity map every time
+        started = time.perf_counter()
+        rows, body = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "rows": rows,
+        "bytes": len(body),
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+    from models import Task
+    from api import serialization
+
+    # Every task is serialized, so spread them over enough projects that
+    # the skewed per-project sizes average out to about --tasks
+    tasks_per_feature = 20
+    features_per_project = 20
+    projects = max(1, args.tasks // (tasks_per_feature * features_per_project))
+
+    def orm_to_dict():
+        tasks = [task.to_dict() for task in Task.query.all()]
+        return len(tasks), app.json.dumps(tasks).encode()
+
+    def columnar():
+        tasks = serialization.task_serializer.all(Task.query)
+        return len(tasks), serialization.dumps(tasks)
+
+    with app.app_context():
+        counts = seed_dataset(
+            users=50,
+            projects=projects,
+            features_per_project=features_per_project,
+            tasks_per_feature=tasks_per_feature,
+        )
+        results = {"orm_to_dict_stdlib_json": run(orm_to_dict, args.repeat)}
+        if serialization.orjson is not None:
+            results["columnar_orjson"] = run(columnar, args.repeat)
+        fast_backend, serialization.orjson = serialization.orjson, None
+        results["columnar_stdlib_json"] = run(columnar, args.repeat)
+        serialization.orjson = fast_backend
+
+    print(json.dumps({"dataset": counts, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
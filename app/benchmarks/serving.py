@@ -0,0 +1,256 @@
+"""
+Requests/sec through gunicorn (gunicorn.conf.py) as the worker count grows.
+
+Run from the app directory:
+
+    python -m benchmarks.serving --workers 1,2,4 --duration 10
+    python -m benchmarks.serving --database-url postgresql://...
+
+Starts gunicorn once per worker count against the same synthetic dataset
+and drives the read endpoints from --clients processes with --connections
+keep-alive connections each. The load generator runs on the same machine,
+so give it spare cores: with N cores, workers above roughly N/2 measure
+the client as much as the server. The database is filled with synthetic
+rows, so point --database-url at a scratch database only.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+from .common import load_app, percentiles, seed_dataset
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_paths(project_id):
+    """
+    The project owner's email and the project's read endpoints
+    """
+    from models import db, Feature, Project, User
+
+    owner_id = db.session.get(Project, project_id).owner_id
+    feature_id = (
+        db.session.query(Feature.id)
+        .filter(Feature.project_id == project_id)
+        .order_by(Feature.id)
+        .limit(1)
+        .scalar()
+    )
+    email = db.session.get(User, owner_id).email
+    project = f"/api/projects/{project_id}"
+    return email, [
+        "/api/projects",
+        project,
+        f"{project}/features",
+        f"{project}/sprints",
+        f"{project}/features/{feature_id}/tasks",
+        f"{project}/summary",
+    ]
+
+
+def cookies(response):
+    return "; ".join(
+        value.split(";")[0]
+        for name, value in response.getheaders()
+        if name.lower() == "set-cookie"
+    )
+
+
+def login(port, email):
+    """
+    Returns the cookie header of a logged in session
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("GET", "/api/auth/")
+    response = connection.getresponse()
+    response.read()
+    csrf = cookies(response)
+    connection.request(
+        "POST",
+        "/api/auth/login",
+        body=urlencode({"email": email, "password": "password"}),
+        headers={
+            "Cookie": csrf,
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+    )
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"login failed with {response.status}")
+    connection.close()
+    return cookies(response)
+
+
+def client(port, cookie, paths, connections, duration):
+    """
+    One load generator process: `connections` threads issuing requests
+    back to back for `duration` seconds. Returns latencies and errors.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def loop(offset):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        timings, failed, index = [], 0, offset
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers={"Cookie": cookie})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+            if ok:
+                timings.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+            errors[0] += failed
+
+    threads = [
+        threading.Thread(target=loop, args=(n,)) for n in range(connections)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def start_server(port, workers, threads, env):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            "__init__:app",
+        ],
+        cwd=APP_DIR,
+        env={
+            **env,
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "WEB_CONCURRENCY": str(workers),
+            "GUNICORN_THREADS": str(threads),
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(server.stderr.read().decode())
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            connection.request("GET", "/api/auth/")
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not start within 30 seconds")
+
+
+def run(workers, args, env, email, paths):
+    server = start_server(args.port, workers, args.threads, env)
+    try:
+        cookie = login(args.port, email)
+        # Warm the workers' connection pools and caches
+        client(args.port, cookie, paths, args.connections, 1)
+        with multiprocessing.Pool(args.clients) as pool:
+            started = time.perf_counter()
+            results = pool.starmap(
+                client,
+                [(args.port, cookie, paths, args.connections, args.duration)]
+                * args.clients,
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = [t for timings, _ in results for t in timings]
+    errors = sum(failed for _, failed in results)
+    return {
+        "workers": workers,
+        "threads": args.threads,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted(
+        {1, *(2**n for n in range(1, 8) if 2**n <= cores)}
+    )
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url")
+    parser.add_argument(
+        "--workers",
+        default=",".join(map(str, default_workers)),
+        help="comma separated worker counts to try",
+    )
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=max(1, cores // 2))
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument(
+        "--response-cache",
+        default="none",
+        help="RESPONSE_CACHE_BACKEND for the server; none measures the "
+        "full request path",
+    )
+    args = parser.parse_args()
+
+    app = load_app(args.database_url)
+    with app.app_context():
+        counts = seed_dataset(users=100, projects=50)
+        email, paths = bench_paths(project_id=1)
+
+    env = {
+        **os.environ,
+        "RESPONSE_CACHE_BACKEND": args.response_cache,
+        "OVERDUE_SWEEP_INTERVAL": "0",
+        "SQL_TIMING_HEADERS": "false",
+        "GUNICORN_ACCESS_LOG": "",
+        "GUNICORN_LOG_LEVEL": "warning",
+    }
+    results = [
+        run(int(workers), args, env, email, paths)
+        for workers in args.workers.split(",")
+    ]
+    print(
+        json.dumps(
+            {
+                "cores": cores,
+                "dataset": counts,
+                "paths": paths,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
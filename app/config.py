@@ -1,4 +1,31 @@
 import os
+import tempfile
+from db_pool import TimedQueuePool
+
+
+def engine_options(
+    database_uri, pool_size, max_overflow, pool_timeout, pool_recycle
+):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a profile. The DB_POOL_* environment
+    variables override the profile's numbers. SQLite keeps Flask-SQLAlchemy's
+    defaults, as its pools don't take these options.
+    """
+    if not database_uri or database_uri.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        # Connections each worker keeps open, and how many more it may open
+        # under load before callers queue for pool_timeout seconds
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", pool_timeout)),
+        # Replaced before a proxy or the server drops them as idle
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", pool_recycle)),
+        # Detects connections that died while checked in (a database
+        # restart or failover) instead of failing the next request
+        "pool_pre_ping": True,
+    }
 
 
 class Config:
@@ -9,4 +36,154 @@ class Config:
     # url in the hidden config vars to start with postgres.
     # so the connection uri must be updated here (for production)
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
-    SQLALCHEMY_ECHO = True
+    # Logging every statement is expensive; opt in with SQLALCHEMY_ECHO=true
+    SQLALCHEMY_ECHO = os.environ.get("SQLALCHEMY_ECHO", "").lower() == "true"
+    # Per-request SQL instrumentation (see instrumentation.py). The
+    # X-Query-Count and Server-Timing headers show every client how much
+    # database work a request did, so they're off unless asked for;
+    # DevelopmentConfig and the endpoint benchmark turn them on
+    SQL_TIMING_HEADERS = (
+        os.environ.get("SQL_TIMING_HEADERS", "").lower() == "true"
+    )
+    SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", 200))
+    SQL_SLOW_QUERY_SAMPLE_RATE = float(
+        os.environ.get("SQL_SLOW_QUERY_SAMPLE_RATE", 1.0)
+    )
+    # flask-login user loader cache (see models/user_cache.py)
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 1024))
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+    # Project board response cache (see api/response_cache.py): memory,
+    # sqlite (shared by the workers on one host) or none
+    RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 2048))
+    RESPONSE_CACHE_PATH = os.environ.get(
+        "RESPONSE_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "taskflow-response-cache.sqlite3"),
+    )
+    # Project change events (see events.py): local (this process only) or
+    # unix (fanned out to every worker on the host through EVENTS_SOCKET_DIR)
+    EVENTS_BACKEND = os.environ.get("EVENTS_BACKEND", "local")
+    EVENTS_SOCKET_DIR = os.environ.get(
+        "EVENTS_SOCKET_DIR",
+        os.path.join(tempfile.gettempdir(), "taskflow-events"),
+    )
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", 15))
+    SSE_MAX_STREAM_SECONDS = float(
+        os.environ.get("SSE_MAX_STREAM_SECONDS", 300)
+    )
+    # Open event streams per worker; each holds a thread (or greenlet)
+    SSE_MAX_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", 100))
+    # In-process overdue sweep (see sweeper.py); 0 disables it, leaving
+    # `flask tasks sweep-overdue` for cron
+    OVERDUE_SWEEP_INTERVAL = float(
+        os.environ.get("OVERDUE_SWEEP_INTERVAL", 300)
+    )
+    OVERDUE_SWEEP_BATCH_SIZE = int(
+        os.environ.get("OVERDUE_SWEEP_BATCH_SIZE", 1000)
+    )
+    OVERDUE_SWEEP_LOCK_PATH = os.environ.get(
+        "OVERDUE_SWEEP_LOCK_PATH",
+        os.path.join(tempfile.gettempdir(), "taskflow-overdue-sweep.lock"),
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+    # Longest a statement may run during a request (Postgres only; see
+    # db_pool.py). 0 means no limit.
+    SQL_STATEMENT_TIMEOUT_MS = int(
+        os.environ.get("SQL_STATEMENT_TIMEOUT_MS", 0)
+    )
+    # Requests a worker handles at once, waiting for a free slot beyond
+    # that (see db_pool.py). 0 means no limit.
+    MAX_CONCURRENT_REQUESTS = int(
+        os.environ.get("MAX_CONCURRENT_REQUESTS", 0)
+    )
+
+
+class DevelopmentConfig(Config):
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        Config.SQLALCHEMY_DATABASE_URI,
+        pool_size=2,
+        max_overflow=5,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+    SQL_STATEMENT_TIMEOUT_MS = int(
+        os.environ.get("SQL_STATEMENT_TIMEOUT_MS", 30000)
+    )
+    SQL_TIMING_HEADERS = (
+        os.environ.get("SQL_TIMING_HEADERS", "true").lower() == "true"
+    )
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=5,
+        pool_recycle=-1,
+    )
+    SQL_STATEMENT_TIMEOUT_MS = int(
+        os.environ.get("SQL_STATEMENT_TIMEOUT_MS", 5000)
+    )
+    OVERDUE_SWEEP_INTERVAL = 0
+    RESPONSE_CACHE_BACKEND = "memory"
+    EVENTS_BACKEND = "local"
+
+
+class ProductionConfig(Config):
+    # A gthread worker has threads for GUNICORN_THREADS requests plus its
+    # event streams (see gunicorn.conf.py), and MAX_CONCURRENT_REQUESTS
+    # keeps it to GUNICORN_THREADS requests at once, so that many
+    # connections serve it without waiting. Streams hold no connection.
+    # Overflow absorbs bursts from the overdue sweeper and request spikes;
+    # keep workers x (pool_size + max_overflow) under max_connections.
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        Config.SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.environ.get("GUNICORN_THREADS", 4)),
+        max_overflow=2,
+        pool_timeout=10,
+        pool_recycle=1800,
+    )
+    SQL_STATEMENT_TIMEOUT_MS = int(
+        os.environ.get("SQL_STATEMENT_TIMEOUT_MS", 10000)
+    )
+    MAX_CONCURRENT_REQUESTS = int(
+        os.environ.get(
+            "MAX_CONCURRENT_REQUESTS", os.environ.get("GUNICORN_THREADS", 4)
+        )
+    )
+    # gunicorn runs several workers, and the local broker only reaches
+    # streams in the worker that handled the write
+    EVENTS_BACKEND = os.environ.get("EVENTS_BACKEND", "unix")
+
+
+config_profiles = {
+    "development": DevelopmentConfig,
+    "test": TestConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """
+    Config class for name, defaulting to APP_CONFIG, then FLASK_ENV, then
+    development
+    """
+    name = (
+        name
+        or os.environ.get("APP_CONFIG")
+        or os.environ.get("FLASK_ENV")
+        or "development"
+    )
+    try:
+        return config_profiles[name]
+    except KeyError:
+        raise ValueError(f"Unknown config profile: {name}") from None
@@ -0,0 +1,163 @@
+"""
+Connection pool metrics, the request concurrency limit and the per-request
+statement timeout.
+
+Server databases use TimedQueuePool (see engine_options in config.py),
+which records how many checkouts there were, how long callers waited for a
+connection and how many gave up after pool_timeout. /api/metrics reports
+those alongside the pool's current in-use and overflow counts, so an
+undersized pool shows up as growing waits before it shows up as errors.
+
+gunicorn's gthread workers run requests and event streams on one shared
+thread pool that is much larger than the database pool (see
+gunicorn.conf.py). MAX_CONCURRENT_REQUESTS caps how many requests a worker
+handles at once; the others wait for a slot instead of queueing in the
+pool and failing after pool_timeout. A slot is held until the view has
+returned, so streaming responses give theirs back before they start
+streaming.
+"""
+import threading
+import time
+from flask import has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from models import db
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that counts checkouts, checkout wait time and timeouts
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._stats_lock = threading.Lock()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class DatabasePool:
+    """
+    Applies SQL_STATEMENT_TIMEOUT_MS to connections checked out during a
+    request (Postgres only; background jobs and CLI commands run without a
+    limit), answers pool timeouts with 503 and reports pool statistics.
+    """
+
+    def __init__(self, app=None):
+        self.statement_timeout = 0
+        self.max_requests = 0
+        self._request_slots = None
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.statement_timeout = app.config["SQL_STATEMENT_TIMEOUT_MS"]
+        self.max_requests = app.config["MAX_CONCURRENT_REQUESTS"]
+        if self.max_requests:
+            self._request_slots = threading.BoundedSemaphore(
+                self.max_requests
+            )
+            app.wsgi_app = self.limit_requests(app.wsgi_app)
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            if engine.dialect.name == "postgresql" and self.statement_timeout:
+                event.listen(engine, "checkout", self.set_statement_timeout)
+        app.register_error_handler(exc.TimeoutError, self.pool_exhausted)
+
+    def limit_requests(self, wsgi_app):
+        """
+        Wraps wsgi_app so at most max_requests calls run at once
+        """
+
+        def limited(environ, start_response):
+            if not self._request_slots.acquire(blocking=False):
+                with self._waiting_lock:
+                    self._waiting += 1
+                try:
+                    self._request_slots.acquire()
+                finally:
+                    with self._waiting_lock:
+                        self._waiting -= 1
+            try:
+                return wsgi_app(environ, start_response)
+            finally:
+                self._request_slots.release()
+
+        return limited
+
+    def set_statement_timeout(self, dbapi_connection, record, proxy):
+        timeout = self.statement_timeout if has_request_context() else 0
+        # SET persists on the connection, so it's only sent when the
+        # previous checkout wanted a different value
+        if record.info.get("statement_timeout") == timeout:
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {int(timeout)}")
+        cursor.close()
+        # Committed so the rollback on check-in doesn't undo it
+        dbapi_connection.commit()
+        record.info["statement_timeout"] = timeout
+
+    @staticmethod
+    def pool_exhausted(e):
+        return {"message": "Database is busy, try again"}, 503, {
+            "Retry-After": "1"
+        }
+
+    def stats(self):
+        pool = db.engine.pool
+        stats = {
+            "class": type(pool).__name__,
+            "statement_timeout_ms": self.statement_timeout,
+        }
+        if self.max_requests:
+            stats.update(
+                max_concurrent_requests=self.max_requests,
+                requests_waiting=self._waiting,
+            )
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                # overflow() counts down from -size until the pool is full
+                overflow=max(0, pool.overflow()),
+            )
+        if isinstance(pool, TimedQueuePool):
+            with pool._stats_lock:
+                checkouts = pool.checkouts
+                stats.update(
+                    checkouts=checkouts,
+                    timeouts=pool.timeouts,
+                    wait_avg_ms=(
+                        round(pool.wait_total * 1000 / checkouts, 3)
+                        if checkouts
+                        else None
+                    ),
+                    wait_max_ms=round(pool.wait_max * 1000, 3),
+                )
+        return stats
+
+
+database_pool = DatabasePool()
@@ -0,0 +1,253 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from flask import Response
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger("taskflow.events")
+
+
+class Subscription:
+    def __init__(self, project_id, maxsize=100):
+        self.project_id = project_id
+        self.queue = queue.Queue(maxsize)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalBroker:
+    """
+    Fans change events out to the subscribers in this process
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id):
+        subscription = Subscription(project_id)
+        with self._lock:
+            self._subscribers[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, message):
+        self.published += 1
+        self.deliver(message)
+
+    def deliver(self, message):
+        project_id = message["project_id"]
+        with self._lock:
+            subscribers = list(self._subscribers.get(project_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+                self.delivered += 1
+            except queue.Full:
+                # Events only say "something changed"; a client that fell
+                # this far behind catches up from /changes anyway
+                self.dropped += 1
+
+
+class UnixSocketBroker(LocalBroker):
+    """
+    Fans change events out across the worker processes on one host.
+
+    Every process with subscribers binds a datagram socket in directory
+    and relays what it receives to its local subscribers. Publishing sends
+    the event to every socket in the directory, so no broker process is
+    needed; sockets left behind by dead workers are removed on the first
+    failed send.
+    """
+
+    name = "unix"
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        self._pid = None
+        self._path = None
+
+    def subscribe(self, project_id):
+        self._listen()
+        return super().subscribe(project_id)
+
+    def _listen(self):
+        # Sockets and threads don't survive a fork, so each worker binds
+        # its own on first use
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(
+                self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+            )
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path)
+            atexit.register(self._remove, path)
+            threading.Thread(
+                target=self._receive, args=(sock,), daemon=True
+            ).start()
+            self._path = path
+            self._pid = os.getpid()
+
+    def _receive(self, sock):
+        while True:
+            data = sock.recv(65536)
+            try:
+                self.deliver(json.loads(data))
+            except (ValueError, KeyError):
+                logger.warning("ignoring malformed event %r", data[:200])
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, message):
+        self.published += 1
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return  # nobody has subscribed yet
+        data = json.dumps(message).encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for name in names:
+                if not name.endswith(".sock"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    self._remove(path)  # its worker is gone
+                except OSError:
+                    # Receiver's buffer is full; it will catch up from
+                    # /changes like any client that misses an event
+                    self.dropped += 1
+
+
+class ProjectEvents:
+    """
+    Server-Sent Events for project changes.
+
+    Project.bump_cache_version, which runs for every write to a project's
+    board, queues the project id on the session. Once the transaction
+    commits, one event per changed project is published to the broker, and
+    each open /events stream of that project receives it. Events carry
+    only the project id: clients react by polling /changes.
+    """
+
+    def __init__(self, app=None):
+        self.broker = LocalBroker()
+        self.heartbeat = 15
+        self.max_stream = 300
+        self.max_clients = 100
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config["EVENTS_BACKEND"]
+        if backend == "unix":
+            self.broker = UnixSocketBroker(app.config["EVENTS_SOCKET_DIR"])
+        elif backend == "local":
+            self.broker = LocalBroker()
+        else:
+            raise ValueError(f"Unknown events backend: {backend}")
+        self.heartbeat = app.config["SSE_HEARTBEAT_SECONDS"]
+        self.max_stream = app.config["SSE_MAX_STREAM_SECONDS"]
+        self.max_clients = app.config["SSE_MAX_CLIENTS"]
+
+        if not event.contains(db.session, "after_commit", self.publish):
+            event.listen(db.session, "after_commit", self.publish)
+            event.listen(db.session, "after_rollback", self.discard)
+
+    def publish(self, session):
+        for project_id in session.info.pop("changed_projects", ()):
+            try:
+                self.broker.publish({"project_id": project_id})
+            except OSError:
+                logger.exception("publishing project change failed")
+
+    def discard(self, session):
+        session.info.pop("changed_projects", None)
+
+    def stream(self, project_id):
+        """
+        Streaming response for one subscriber, or 503 when this worker
+        already serves max_clients streams
+        """
+        if self.broker.subscriber_count() >= self.max_clients:
+            return {"message": "Too many open event streams"}, 503, {
+                "Retry-After": "5"
+            }
+        # Nothing below touches the database; give the connection back
+        # rather than holding it for the life of the stream
+        db.session.close()
+        return Response(
+            self._events(project_id),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def _events(self, project_id):
+        # Streams end after max_stream seconds so a worker thread is never
+        # tied up indefinitely; EventSource reconnects by itself. The
+        # subscription is made here so it's only held while iterating.
+        deadline = time.monotonic() + self.max_stream
+        ready = json.dumps({"project_id": project_id})
+        subscription = self.broker.subscribe(project_id)
+        try:
+            yield f"retry: 3000\nevent: ready\ndata: {ready}\n\n"
+            while time.monotonic() < deadline:
+                message = subscription.get(timeout=self.heartbeat)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: change\ndata: {json.dumps(message)}\n\n"
+        finally:
+            self.broker.unsubscribe(subscription)
+
+    def stats(self):
+        return {
+            "backend": self.broker.name,
+            "subscribers": self.broker.subscriber_count(),
+            "published": self.broker.published,
+            "delivered": self.broker.delivered,
+            "dropped": self.broker.dropped,
+        }
+
+
+project_events = ProjectEvents()
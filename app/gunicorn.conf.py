@@ -0,0 +1,118 @@
+"""
+Production gunicorn settings, read by init.sh:
+
+    gunicorn -c gunicorn.conf.py "__init__:app"
+
+Every setting can be overridden from the environment:
+
+    GUNICORN_BIND           default 0.0.0.0:$PORT (PORT defaults to 5000)
+    WEB_CONCURRENCY         worker processes, default CPUs + 1, lowered
+                            to fit DB_CONNECTION_BUDGET
+    DB_CONNECTION_BUDGET    database connections all workers together may
+                            open, default 80
+    GUNICORN_WORKER_CLASS   gthread (default) or gevent (pip install gevent)
+    GUNICORN_THREADS        request threads per gthread worker, default 4
+    SSE_MAX_CLIENTS         event streams per worker, default 32 (gthread)
+    GUNICORN_PRELOAD        import the app once in the master, default
+                            true except with gevent
+    GUNICORN_MAX_REQUESTS   recycle a worker after this many requests
+    GUNICORN_TIMEOUT        seconds a worker may go silent before it's killed
+    GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE, GUNICORN_LOG_LEVEL
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get(
+    "GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = _env_int("GUNICORN_THREADS", 4)
+
+
+def _cpus():
+    # The CPUs this process may run on, which in a container can be fewer
+    # than the host's cpu_count()
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+def _default_workers():
+    """
+    One gthread worker per CPU plus one (threads cover blocking on I/O),
+    but no more than DB_CONNECTION_BUDGET allows: each worker's pool opens
+    up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections (see ProductionConfig).
+    Leave room under Postgres's max_connections for migrations, psql and
+    other clients.
+    """
+    per_worker = _env_int("DB_POOL_SIZE", threads) + _env_int(
+        "DB_MAX_OVERFLOW", 2
+    )
+    budget = _env_int("DB_CONNECTION_BUDGET", 80)
+    return max(1, min(_cpus() + 1, budget // per_worker))
+
+
+workers = _env_int("WEB_CONCURRENCY", _default_workers())
+if worker_class == "gthread":
+    # Thread budget: an open event stream holds a thread (but no database
+    # connection) for up to SSE_MAX_STREAM_SECONDS, so each worker gets
+    # SSE_MAX_CLIENTS threads for streams on top of GUNICORN_THREADS for
+    # requests. Idle stream threads only wait on a queue, so a few dozen
+    # per worker are cheap. gthread doesn't tell the two apart, so
+    # ProductionConfig sets MAX_CONCURRENT_REQUESTS to GUNICORN_THREADS, the
+    # size of the database pool, and further requests wait for a slot.
+    sse_clients = _env_int("SSE_MAX_CLIENTS", 32)
+    os.environ["SSE_MAX_CLIENTS"] = str(sse_clients)
+    threads += sse_clients
+
+# The app is imported once in the master and the workers fork from it,
+# which saves memory and startup time. Connections made during the import
+# are dropped in post_fork below. gevent has to patch the standard library
+# before the app is imported, so it defaults to loading in each worker.
+preload_app = (
+    os.environ.get(
+        "GUNICORN_PRELOAD", str(worker_class != "gevent")
+    ).lower()
+    == "true"
+)
+
+# Recycle workers so slow leaks can't grow without bound; the jitter keeps
+# them from all restarting at once
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int(
+    "GUNICORN_MAX_REQUESTS_JITTER", max(1, max_requests // 10)
+)
+
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+# In-flight requests get this long to finish on SIGTERM or recycling
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# The worker heartbeat file is written every second; keep it off the
+# overlay filesystem in containers
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """
+    Drops the database connections inherited from the master. close=False
+    leaves the sockets alone for the master, which still owns them; the
+    worker's pool opens its own on first use.
+    """
+    if not preload_app:
+        return
+    from models import db
+
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
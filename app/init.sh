@@ -55,7 +55,7 @@ export FLASK_APP=__init__.py
 
 if [ "$REFRESH_DB" = "true" ]; then
     flask db migrate -m "initial migration"
-    flask db upgrade
+    flask db upgrade heads
     
     # Run seeds
     echo "Running seeds..."
@@ -63,9 +63,9 @@ if [ "$REFRESH_DB" = "true" ]; then
     echo "Database refresh completed!"
 else
     # Run any pending migrations
-    flask db upgrade
+    flask db upgrade heads
     echo "Database migrations up to date!"
 fi
 
 echo "Starting Gunicorn server..."
-exec gunicorn --bind 0.0.0.0:5000 "__init__:app"
\ No newline at end of file
+exec gunicorn --config gunicorn.conf.py "__init__:app"
\ No newline at end of file
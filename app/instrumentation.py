@@ -0,0 +1,78 @@
+import logging
+import random
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_logger = logging.getLogger("taskflow.sql.slow")
+
+
+class SQLInstrumentation:
+    """
+    Per-request SQL accounting built on SQLAlchemy engine events.
+
+    Counts statements and time spent in the database for each request and
+    reports them as X-Query-Count and Server-Timing response headers.
+    Statements slower than SQL_SLOW_QUERY_MS are logged to the
+    taskflow.sql.slow logger, sampled at SQL_SLOW_QUERY_SAMPLE_RATE.
+    """
+
+    def __init__(self, app=None):
+        self.slow_query_ms = 200
+        self.sample_rate = 1.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_query_ms = app.config["SQL_SLOW_QUERY_MS"]
+        self.sample_rate = app.config["SQL_SLOW_QUERY_SAMPLE_RATE"]
+
+        event.listen(Engine, "before_cursor_execute", self.before_execute)
+        event.listen(Engine, "after_cursor_execute", self.after_execute)
+        app.before_request(self.start_request)
+        if app.config["SQL_TIMING_HEADERS"]:
+            app.after_request(self.add_headers)
+
+    def start_request(self):
+        g.request_started = time.perf_counter()
+        g.query_count = 0
+        g.query_time = 0.0
+
+    # The start time lives on the statement's execution context rather than
+    # the pooled connection: after_cursor_execute doesn't run for a statement
+    # that fails, and the context is discarded along with it
+
+    def before_execute(self, conn, cursor, statement, params, context, many):
+        context._query_started = time.perf_counter()
+
+    def after_execute(self, conn, cursor, statement, params, context, many):
+        elapsed = time.perf_counter() - context._query_started
+        in_request = has_request_context()
+        if in_request and "query_count" in g:
+            g.query_count += 1
+            g.query_time += elapsed
+
+        elapsed_ms = elapsed * 1000
+        if (
+            elapsed_ms >= self.slow_query_ms
+            and random.random() < self.sample_rate
+        ):
+            slow_query_logger.warning(
+                "slow query (%.1f ms) during %s: %s",
+                elapsed_ms,
+                request.path if in_request else "<no request>",
+                statement,
+            )
+
+    def add_headers(self, response):
+        if "query_count" not in g:
+            return response
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        db_ms = g.query_time * 1000
+        response.headers["X-Query-Count"] = str(g.query_count)
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{g.query_count} queries", '
+            f"total;dur={total_ms:.1f}"
+        )
+        return response
@@ -0,0 +1,55 @@
+"""add foreign key and filter indexes
+
+Revision ID: 3f2a9c1d7b42
+Revises:
+Create Date: 2026-10-18 09:12:41.507118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f2a9c1d7b42"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - kept in step with the models' index=True
+# columns and __table_args__ so autogenerate sees no difference afterwards.
+INDEXES = [
+    ("ix_projects_owner_id", "projects", ["owner_id"]),
+    ("ix_project_users_user_id", "project_users", ["user_id"]),
+    ("ix_sprints_project_id", "sprints", ["project_id"]),
+    ("ix_features_project_id", "features", ["project_id"]),
+    ("ix_features_sprint_id", "features", ["sprint_id"]),
+    ("ix_tasks__created_by", "tasks", ["_created_by"]),
+    ("ix_tasks_feature_id_status", "tasks", ["feature_id", "status"]),
+    ("ix_tasks_assigned_to_due_date", "tasks", ["assigned_to", "_due_date"]),
+]
+
+
+def existing_indexes():
+    # The initial schema is generated per environment by `flask db migrate`
+    # (see init.sh) and may already include these, so only add what's missing
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    return {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _ in INDEXES}
+        if table in tables
+    }
+
+
+def upgrade():
+    existing = existing_indexes()
+    for name, table, columns in INDEXES:
+        if table in existing and name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    existing = existing_indexes()
+    for name, table, _ in reversed(INDEXES):
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
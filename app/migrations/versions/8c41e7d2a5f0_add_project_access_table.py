@@ -0,0 +1,61 @@
+"""add project_access table
+
+Revision ID: 8c41e7d2a5f0
+Revises: 3f2a9c1d7b42
+Create Date: 2026-10-18 10:03:27.114802
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c41e7d2a5f0"
+down_revision = "3f2a9c1d7b42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "projects" not in tables:
+        return
+
+    if "project_access" not in tables:
+        op.create_table(
+            "project_access",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["project_id"], ["projects.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(
+                ["user_id"], ["users.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("user_id", "project_id"),
+        )
+        op.create_index(
+            "ix_project_access_project_id", "project_access", ["project_id"]
+        )
+
+    # Backfill from ownership and membership; owners win over membership
+    op.execute("DELETE FROM project_access")
+    op.execute(
+        """
+        INSERT INTO project_access (user_id, project_id, role)
+        SELECT owner_id, id, 'owner' FROM projects
+        UNION ALL
+        SELECT pu.user_id, pu.project_id, 'member'
+        FROM project_users pu
+        JOIN projects p ON p.id = pu.project_id
+        WHERE pu.user_id != p.owner_id
+        """
+    )
+
+
+def downgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "project_access" in tables:
+        op.drop_index("ix_project_access_project_id", "project_access")
+        op.drop_table("project_access")
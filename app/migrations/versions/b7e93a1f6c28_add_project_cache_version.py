@@ -0,0 +1,45 @@
+"""add projects.cache_version
+
+Revision ID: b7e93a1f6c28
+Revises: 8c41e7d2a5f0
+Create Date: 2026-10-18 14:21:09.527310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e93a1f6c28"
+down_revision = "8c41e7d2a5f0"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    columns = _columns("projects")
+    if columns is None or "cache_version" in columns:
+        return
+    with op.batch_alter_table("projects") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "cache_version",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+
+
+def downgrade():
+    columns = _columns("projects")
+    if columns and "cache_version" in columns:
+        with op.batch_alter_table("projects") as batch_op:
+            batch_op.drop_column("cache_version")
@@ -0,0 +1,94 @@
+"""add tombstones and change feed indexes
+
+Revision ID: d41c08e5b9a3
+Revises: b7e93a1f6c28
+Create Date: 2026-10-18 16:40:52.203118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d41c08e5b9a3"
+down_revision = "b7e93a1f6c28"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    (
+        "ix_features_project_id_updated_at",
+        "features",
+        ["project_id", "updated_at"],
+    ),
+    (
+        "ix_sprints_project_id_updated_at",
+        "sprints",
+        ["project_id", "updated_at"],
+    ),
+    ("ix_tasks_feature_id_updated_at", "tasks", ["feature_id", "updated_at"]),
+]
+# Single-column indexes from 3f2a9c1d7b42 that the composites above lead
+# with, so they only add write cost
+REPLACED = [
+    ("ix_features_project_id", "features", ["project_id"]),
+    ("ix_sprints_project_id", "sprints", ["project_id"]),
+]
+
+
+def existing_indexes(inspector, tables):
+    return {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _ in INDEXES}
+        if table in tables
+    }
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if "projects" not in tables:
+        return
+
+    existing = existing_indexes(inspector, tables)
+    for name, table, columns in INDEXES:
+        if table in existing and name not in existing[table]:
+            op.create_index(name, table, columns)
+    for name, table, _ in REPLACED:
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
+
+    if "tombstones" not in tables:
+        op.create_table(
+            "tombstones",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("entity", sa.String(length=20), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["project_id"], ["projects.id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_tombstones_project_id_deleted_at",
+            "tombstones",
+            ["project_id", "deleted_at"],
+        )
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if "tombstones" in tables:
+        op.drop_index("ix_tombstones_project_id_deleted_at", "tombstones")
+        op.drop_table("tombstones")
+
+    existing = existing_indexes(inspector, tables)
+    for name, table, columns in REPLACED:
+        if table in existing and name not in existing[table]:
+            op.create_index(name, table, columns)
+    for name, table, _ in reversed(INDEXES):
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
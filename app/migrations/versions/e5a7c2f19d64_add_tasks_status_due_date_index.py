@@ -0,0 +1,37 @@
+"""add tasks (status, _due_date) index for the overdue sweep
+
+Revision ID: e5a7c2f19d64
+Revises: d41c08e5b9a3
+Create Date: 2026-10-18 17:55:13.840266
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5a7c2f19d64"
+down_revision = "d41c08e5b9a3"
+branch_labels = None
+depends_on = None
+
+NAME = "ix_tasks_status_due_date"
+
+
+def existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    if "tasks" not in inspector.get_table_names():
+        return None
+    return {index["name"] for index in inspector.get_indexes("tasks")}
+
+
+def upgrade():
+    existing = existing_indexes()
+    if existing is not None and NAME not in existing:
+        op.create_index(NAME, "tasks", ["status", "_due_date"])
+
+
+def downgrade():
+    existing = existing_indexes()
+    if existing and NAME in existing:
+        op.drop_index(NAME, table_name="tasks")
@@ -4,3 +4,7 @@ from .feature import Feature
 from .project import Project
 from .sprint import Sprint
 from .task import Task
+from .project_access import ProjectAccess
+from .tombstone import Tombstone
+from . import project_version  # registers the cache version listener
+from .user_cache import user_cache
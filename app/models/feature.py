@@ -5,14 +5,19 @@ from sqlalchemy.orm import validates
 
 class Feature(db.Model):
     __tablename__ = "features"
-
-
+    __table_args__ = (
+        # Change feed: a project's features modified after a watermark (also
+        # serves lookups by project_id alone)
+        db.Index(
+            "ix_features_project_id_updated_at", "project_id", "updated_at"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(
         db.Integer, db.ForeignKey("projects.id"), nullable=False
     )
-    sprint_id = db.Column(db.Integer, db.ForeignKey("sprints.id"))
+    sprint_id = db.Column(db.Integer, db.ForeignKey("sprints.id"), index=True)
     name = db.Column(db.String, nullable=False)
     description = db.Column(db.Text)
     status = db.Column(db.String, default="Not Started")
@@ -61,8 +66,8 @@ class Feature(db.Model):
             raise e
 
     @classmethod
-    def get_features_by_project(cls, project_id):
-        return cls.query.filter_by(project_id=project_id).all()
+    def get_features_by_project(cls, project_id, options=()):
+        return cls.query.options(*options).filter_by(project_id=project_id)
 
     @classmethod
     def delete_feature(cls, id):
@@ -74,15 +79,58 @@ class Feature(db.Model):
         return False
 
     def assign_to_sprint(self, sprint_id):
-        if sprint_id:
-            from .sprint import Sprint
+        if not Feature.assign_features_to_sprint(
+            self.project_id, [self.id], sprint_id
+        ):
+            raise ValueError("Sprint must belong to same project")
+        return self
 
-            sprint = Sprint.query.get(sprint_id)
-            if sprint and sprint.project_id != self.project_id:
-                raise ValueError("Sprint must belong to same project")
-        self.sprint_id = sprint_id
+    @classmethod
+    def _move_to_sprint(cls, query, project_id, sprint_id):
+        from .project import Project
+        from .sprint import Sprint
+
+        if sprint_id is not None:
+            # Checked in the UPDATE itself so a concurrently deleted or
+            # foreign sprint can't be assigned
+            query = query.filter(
+                db.exists().where(
+                    Sprint.id == sprint_id, Sprint.project_id == project_id
+                )
+            )
+        moved = query.update(
+            {"sprint_id": sprint_id}, synchronize_session=False
+        )
+        # Bulk statements bypass the flush listener that does this
+        Project.bump_cache_version([project_id])
         db.session.commit()
-        return self
+        return moved
+
+    @classmethod
+    def assign_features_to_sprint(cls, project_id, feature_ids, sprint_id):
+        """
+        Moves features of the project into sprint_id (None for the backlog)
+        with one UPDATE. Ids outside the project are ignored. Returns the
+        number of features updated; 0 if the sprint isn't in the project.
+        """
+        query = cls.query.filter(
+            cls.project_id == project_id, cls.id.in_(feature_ids)
+        )
+        return cls._move_to_sprint(query, project_id, sprint_id)
+
+    @classmethod
+    def roll_over_sprint(cls, project_id, from_sprint_id, to_sprint_id):
+        """
+        Moves every feature of from_sprint_id that isn't Completed into
+        to_sprint_id (None for the backlog) with one UPDATE. Returns the
+        number of features moved.
+        """
+        query = cls.query.filter(
+            cls.project_id == project_id,
+            cls.sprint_id == from_sprint_id,
+            cls.status != "Completed",
+        )
+        return cls._move_to_sprint(query, project_id, to_sprint_id)
 
     VALID_STATUSES = ["Not Started", "In Progress", "Completed"]
 
@@ -94,8 +142,8 @@ class Feature(db.Model):
             )
         return status
 
-    def to_dict(self):
-        return {
+    def to_dict(self, include=("tasks",)):
+        feature = {
             "id": self.id,
             "project_id": self.project_id,
             "sprint_id": self.sprint_id,
@@ -105,5 +153,9 @@ class Feature(db.Model):
             "priority": self.priority,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
-            "tasks": [task.to_dict() for task in self.tasks],
         }
+        if "tasks" in include:
+            feature["tasks"] = [task.to_dict() for task in self.tasks]
+        if "sprint" in include:
+            feature["sprint"] = self.sprint.to_dict() if self.sprint else None
+        return feature
@@ -0,0 +1,19 @@
+from sqlalchemy.orm import selectinload
+from .project import Project
+
+# Loader strategies for the read endpoints.
+#
+# Each helper returns the ORM options a route should pass to its query so
+# that the relationships touched by to_dict() are loaded up front instead of
+# lazily once per row. Collections use selectinload (one extra SELECT ... IN
+# for the whole page).
+
+
+def project_options(include=("members",)):
+    """
+    Options for loading projects with the relationships named in include
+    """
+    options = []
+    if "members" in include:
+        options.append(selectinload(Project.users))
+    return options
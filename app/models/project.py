@@ -1,6 +1,7 @@
 from .db import db
 from datetime import datetime
 from .user import User
+from .project_access import ProjectAccess
 
 # Association Tables for Many-to-Many
 project_users = db.Table(
@@ -14,6 +15,8 @@ project_users = db.Table(
     db.Column(
         "user_id", db.Integer, db.ForeignKey("users.id"), primary_key=True
     ),
+    # The primary key leads with project_id; lookups by user need their own
+    db.Index("ix_project_users_user_id", "user_id"),
 )
 
 
@@ -23,12 +26,19 @@ class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    owner_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
     due_date = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    # Bumped whenever the project or anything on its board changes; part of
+    # the response cache key (see models/project_version.py)
+    cache_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Relationships
     owner = db.relationship("User", back_populates="projects")
@@ -45,17 +55,23 @@ class Project(db.Model):
     )
 
     # Convert Model to Dictionary
-    def to_dict(self):
-        return {
+    # members can be passed in (see get_members_by_project) so that a list
+    # of projects doesn't lazy-load the association table once per project
+    def to_dict(self, members=None, include=("members",)):
+        project = {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "owner_id": self.owner_id,
             "due_date": self.due_date.isoformat(),
-            "members": [user.id for user in self.users],
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+        if "members" in include:
+            if members is None:
+                members = [user.id for user in self.users]
+            project["members"] = members
+        return project
 
     # Create method (used by route logic)
     @classmethod
@@ -70,20 +86,59 @@ class Project(db.Model):
         db.session.commit()
         return new_project
 
-    # Read method (fetch all projects for a specific user)
+    # Read method (query all projects for a specific user)
     @classmethod
     def get_all_projects(cls, user_id):
-        return cls.query.filter(
-            db.or_(cls.owner_id == user_id, cls.users.any(id=user_id))
-        ).all()
+        return cls.query.join(
+            ProjectAccess, ProjectAccess.project_id == cls.id
+        ).filter(ProjectAccess.user_id == user_id)
+
+    # Batched membership lookup: {project_id: [user_id, ...]} in one query
+    @staticmethod
+    def get_members_by_project(project_ids):
+        members = {project_id: [] for project_id in project_ids}
+        if not members:
+            return members
+        rows = db.session.execute(
+            db.select(project_users.c.project_id, project_users.c.user_id)
+            .where(project_users.c.project_id.in_(list(members)))
+            .order_by(project_users.c.project_id, project_users.c.user_id)
+        )
+        for project_id, user_id in rows:
+            members[project_id].append(user_id)
+        return members
 
     # Get a single project by ID
     @classmethod
-    def get_project_by_id(cls, id, user_id):
-        return cls.query.filter(
-            cls.id == id,
-            db.or_(cls.owner_id == user_id, cls.users.any(id=user_id)),
-        ).first()
+    def get_project_by_id(cls, id, user_id, options=()):
+        return (
+            cls.query.options(*options)
+            .join(ProjectAccess, ProjectAccess.project_id == cls.id)
+            .filter(cls.id == id, ProjectAccess.user_id == user_id)
+            .first()
+        )
+
+    @classmethod
+    def bump_cache_version(cls, project_ids, connection=None):
+        """
+        Increments cache_version of the given projects without touching
+        updated_at, and queues a change event for each of them that is
+        published once the transaction commits (see events.py)
+        """
+        project_ids = set(project_ids)
+        db.session.info.setdefault("changed_projects", set()).update(
+            project_ids
+        )
+        table = cls.__table__
+        statement = (
+            db.update(table)
+            .where(table.c.id.in_(project_ids))
+            .values(
+                cache_version=table.c.cache_version + 1,
+                updated_at=table.c.updated_at,
+            )
+        )
+        (connection or db.session).execute(statement)
 
     # Update method (modify project)
     def update_project(self, name, description, due_date):
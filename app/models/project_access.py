@@ -0,0 +1,103 @@
+from .db import db
+from itertools import chain
+from sqlalchemy import event, inspect
+
+
+class ProjectAccess(db.Model):
+    """
+    Denormalized (user, project) -> role lookup.
+
+    Derived from projects.owner_id and the project_users association table
+    and kept in sync by the after_flush listener below, so authorization is
+    a single primary-key probe instead of loading the user's projects.
+    """
+
+    __tablename__ = "project_access"
+
+    OWNER = "owner"
+    MEMBER = "member"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    project_id = db.Column(
+        db.Integer,
+        db.ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    role = db.Column(db.String(20), nullable=False)
+
+    @classmethod
+    def get_role(cls, user_id, project_id):
+        access = db.session.get(cls, (user_id, project_id))
+        return access.role if access else None
+
+    @classmethod
+    def rebuild(cls, project_ids=None, connection=None):
+        """
+        Recomputes access rows for the given projects (all when None) from
+        ownership and membership. Used by the flush listener and after bulk
+        loads that bypass the ORM.
+        """
+        from .project import Project, project_users
+
+        connection = connection or db.session.connection()
+        owners = db.select(
+            Project.owner_id, Project.id, db.literal(cls.OWNER)
+        )
+        members = (
+            db.select(
+                project_users.c.user_id,
+                project_users.c.project_id,
+                db.literal(cls.MEMBER),
+            )
+            .join(Project, Project.id == project_users.c.project_id)
+            .where(project_users.c.user_id != Project.owner_id)
+        )
+        delete = db.delete(cls.__table__)
+        if project_ids is not None:
+            project_ids = list(project_ids)
+            owners = owners.where(Project.id.in_(project_ids))
+            members = members.where(
+                project_users.c.project_id.in_(project_ids)
+            )
+            delete = delete.where(cls.project_id.in_(project_ids))
+
+        connection.execute(delete)
+        connection.execute(
+            db.insert(cls.__table__).from_select(
+                ["user_id", "project_id", "role"],
+                db.union_all(owners, members),
+            )
+        )
+
+
+@event.listens_for(db.session, "after_flush")
+def sync_project_access(session, flush_context):
+    from .project import Project
+    from .user import User
+
+    project_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Project):
+            project_ids.add(obj.id)
+    for obj in session.new | session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Project):
+            if (
+                state.attrs.owner_id.history.has_changes()
+                or state.attrs.users.history.has_changes()
+            ):
+                project_ids.add(obj.id)
+        elif isinstance(obj, User):
+            # Membership changed from the user side of the relationship
+            history = state.attrs.projects.history
+            changed = chain(history.added or (), history.deleted or ())
+            project_ids.update(project.id for project in changed)
+
+    project_ids.discard(None)
+    if project_ids:
+        ProjectAccess.rebuild(project_ids, connection=session.connection())
@@ -0,0 +1,55 @@
+from .db import db
+from itertools import chain
+from sqlalchemy import event, inspect
+
+
+def _values(state, key):
+    # Current and previous values, so moving a row bumps both projects
+    history = state.attrs[key].history
+    if history.has_changes():
+        return chain(history.added or (), history.deleted or ())
+    return [getattr(state.obj(), key)]
+
+
+@event.listens_for(db.session, "before_flush")
+def bump_project_versions(session, flush_context, instances):
+    """
+    Bumps Project.cache_version for every project whose board (features,
+    sprints, tasks) or membership is about to change, in the same
+    transaction as the change. Bulk UPDATE/DELETE statements bypass the
+    flush and must call Project.bump_cache_version themselves.
+    """
+    from .feature import Feature
+    from .project import Project
+    from .sprint import Sprint
+    from .task import Task
+    from .user import User
+
+    project_ids = set()
+    feature_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        state = inspect(obj)
+        if isinstance(obj, Project):
+            project_ids.add(obj.id)
+        elif isinstance(obj, (Feature, Sprint)):
+            project_ids.update(_values(state, "project_id"))
+        elif isinstance(obj, Task):
+            feature_ids.update(_values(state, "feature_id"))
+        elif isinstance(obj, User):
+            # Membership changed from the user side of the relationship
+            history = state.attrs.projects.history
+            changed = chain(history.added or (), history.deleted or ())
+            project_ids.update(project.id for project in changed)
+
+    connection = session.connection()
+    feature_ids.discard(None)
+    if feature_ids:
+        rows = connection.execute(
+            db.select(Feature.project_id).where(Feature.id.in_(feature_ids))
+        )
+        project_ids.update(project_id for project_id, in rows)
+    project_ids.discard(None)
+    if project_ids:
+        Project.bump_cache_version(project_ids, connection=connection)
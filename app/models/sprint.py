@@ -4,8 +4,13 @@ from datetime import datetime
 
 class Sprint(db.Model):
     __tablename__ = "sprints"
-
-
+    __table_args__ = (
+        # Change feed: a project's sprints modified after a watermark (also
+        # serves lookups by project_id alone)
+        db.Index(
+            "ix_sprints_project_id_updated_at", "project_id", "updated_at"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(
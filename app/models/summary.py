@@ -0,0 +1,146 @@
+from .db import db
+from datetime import datetime
+from .feature import Feature
+from .sprint import Sprint
+from .task import Task
+
+# Dashboard aggregates for a project.
+#
+# The task table is grouped in SQL by (feature, status, assignee), so the
+# database returns at most features x statuses x assignees rows however
+# many tasks there are. The per-feature, per-sprint, per-assignee and
+# project totals are folded from those rows in Python. Sprints are a
+# second, small query so sprints without features still show up.
+
+
+def _stats():
+    return {
+        "tasks": 0,
+        "by_status": {status: 0 for status in Task.VALID_STATUSES},
+        "overdue": 0,
+        "points": 0,
+        "completed_points": 0,
+    }
+
+
+def _add(stats, status, count, points, overdue):
+    stats["tasks"] += count
+    stats["by_status"][status] = stats["by_status"].get(status, 0) + count
+    stats["overdue"] += overdue
+    stats["points"] += points
+    if status == "Completed":
+        stats["completed_points"] += points
+
+
+def _finish(stats):
+    total = stats["tasks"]
+    completed = stats["by_status"]["Completed"]
+    stats["percent_complete"] = (
+        round(completed * 100 / total, 1) if total else None
+    )
+    return stats
+
+
+def project_summary(project_id, now=None):
+    """
+    Status histograms, overdue counts, priority points and assignee
+    workload for a project, per feature, per sprint and in total. Runs two
+    queries regardless of the number of tasks.
+    """
+    now = now or datetime.utcnow()
+    is_overdue = db.or_(
+        Task.status == "Overdue",
+        db.and_(Task.status != "Completed", Task._due_date < now),
+    )
+    rows = (
+        db.session.query(
+            Feature.id,
+            Feature.name,
+            Feature.status,
+            Feature.sprint_id,
+            Task.status,
+            Task.assigned_to,
+            db.func.count(Task.id),
+            db.func.coalesce(db.func.sum(Task.priority), 0),
+            db.func.coalesce(
+                db.func.sum(db.case((is_overdue, 1), else_=0)), 0
+            ),
+        )
+        .outerjoin(Task, Task.feature_id == Feature.id)
+        .filter(Feature.project_id == project_id)
+        .group_by(
+            Feature.id,
+            Feature.name,
+            Feature.status,
+            Feature.sprint_id,
+            Task.status,
+            Task.assigned_to,
+        )
+        .order_by(Feature.id)
+    )
+    sprints = (
+        Sprint.query.filter(Sprint.project_id == project_id)
+        .with_entities(Sprint.id, Sprint.name)
+        .order_by(Sprint.id)
+    )
+
+    totals = _stats()
+    features = {}
+    by_sprint = {
+        sprint_id: {"id": sprint_id, "name": name, "features": 0, **_stats()}
+        for sprint_id, name in sprints
+    }
+    backlog = {"id": None, "name": "Backlog", "features": 0, **_stats()}
+    assignees = {}
+
+    for (
+        feature_id,
+        name,
+        feature_status,
+        sprint_id,
+        status,
+        assigned_to,
+        count,
+        points,
+        overdue,
+    ) in rows:
+        sprint = by_sprint.get(sprint_id, backlog)
+        feature = features.get(feature_id)
+        if feature is None:
+            feature = features[feature_id] = {
+                "id": feature_id,
+                "name": name,
+                "status": feature_status,
+                "sprint_id": sprint_id,
+                **_stats(),
+            }
+            sprint["features"] += 1
+        if not count:
+            continue  # a feature without tasks
+        status = status or "Not Started"  # the column default
+
+        if assigned_to not in assignees:
+            assignees[assigned_to] = {
+                "user_id": assigned_to,
+                "open_tasks": 0,
+                "open_points": 0,
+                **_stats(),
+            }
+        assignee = assignees[assigned_to]
+        if status != "Completed":
+            assignee["open_tasks"] += count
+            assignee["open_points"] += points
+        for stats in (totals, feature, sprint, assignee):
+            _add(stats, status, count, points, overdue)
+
+    return {
+        "project_id": project_id,
+        "totals": _finish(totals),
+        "features": [_finish(f) for f in features.values()],
+        "sprints": [_finish(s) for s in [*by_sprint.values(), backlog]],
+        # Unassigned tasks are listed under user_id null
+        "assignees": sorted(
+            (_finish(a) for a in assignees.values()),
+            key=lambda a: (a["user_id"] is None, a["user_id"] or 0),
+        ),
+    }
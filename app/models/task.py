@@ -5,7 +5,17 @@ from sqlalchemy.orm import validates
 
 class Task(db.Model):
     __tablename__ = "tasks"
-
+    __table_args__ = (
+        # Tasks of a feature, optionally by status (also covers feature_id)
+        db.Index("ix_tasks_feature_id_status", "feature_id", "status"),
+        # A user's assigned tasks ordered/filtered by due date
+        db.Index("ix_tasks_assigned_to_due_date", "assigned_to", "_due_date"),
+        # Change feed: tasks of the project's features modified after a
+        # watermark
+        db.Index("ix_tasks_feature_id_updated_at", "feature_id", "updated_at"),
+        # Overdue sweep: open tasks by due date
+        db.Index("ix_tasks_status_due_date", "status", "_due_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     feature_id = db.Column(
@@ -17,7 +27,7 @@ class Task(db.Model):
     priority = db.Column(db.Integer, default=0)
     assigned_to = db.Column(db.Integer, db.ForeignKey("users.id"))
     _created_by = db.Column(
-        db.Integer, db.ForeignKey("users.id"), nullable=False
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
     )
     _start_date = db.Column(db.DateTime)
     _due_date = db.Column(db.DateTime)
@@ -61,20 +71,63 @@ class Task(db.Model):
         return None
 
     @classmethod
-    def get_accessible_tasks(cls, user):
-        from . import Project, Feature  # Import when needed
+    def get_accessible_tasks(
+        cls,
+        user,
+        status=None,
+        assigned_to=None,
+        due_after=None,
+        due_before=None,
+    ):
+        """
+        Query for every task in a project the user owns or belongs to.
+
+        Access is resolved in the database with an EXISTS probe on
+        project_access for the task's feature, so the cost doesn't grow with
+        the number of projects the user is in. Returns an unexecuted query
+        ordered by id so the caller can page it.
+        """
+        from . import Feature, ProjectAccess  # Import when needed
+
+        has_access = db.exists().where(
+            ProjectAccess.user_id == user.id,
+            ProjectAccess.project_id == Feature.project_id,
+        )
 
-        accessible_projects = Project.query.filter(
-            db.or_(Project.owner_id == user.id, Project.users.contains(user))
-        ).all()
+        query = cls.query.join(Feature, cls.feature_id == Feature.id).filter(
+            has_access
+        )
+        if status:
+            query = query.filter(cls.status.in_(status))
+        if assigned_to is not None:
+            query = query.filter(cls.assigned_to == assigned_to)
+        if due_after is not None:
+            query = query.filter(cls._due_date >= due_after)
+        if due_before is not None:
+            query = query.filter(cls._due_date < due_before)
+        return query.order_by(cls.id)
+
+    @classmethod
+    def get_task_with_role(cls, task_id, user_id):
+        """
+        Loads a task together with the user's role on its project in one
+        query. Returns (task, role) with role None when the user has no
+        access, or None when the task doesn't exist.
+        """
+        from . import Feature, ProjectAccess  # Import when needed
 
         return (
-            cls.query.join(Feature)
-            .filter(
-                Feature.project_id.in_([p.id for p in accessible_projects])
+            db.session.query(cls, ProjectAccess.role)
+            .join(Feature, Feature.id == cls.feature_id)
+            .outerjoin(
+                ProjectAccess,
+                db.and_(
+                    ProjectAccess.project_id == Feature.project_id,
+                    ProjectAccess.user_id == user_id,
+                ),
             )
-            .distinct()
-            .all()
+            .filter(cls.id == task_id)
+            .first()
         )
 
     @classmethod
@@ -125,6 +178,10 @@ class Task(db.Model):
             for key, value in kwargs.items():
                 setattr(self, key, value)
 
+            if self.status == "Overdue":
+                # The due date may have moved into the future
+                db.session.flush()
+                Task.reopen([self.id])
             db.session.commit()
             return self
         except Exception as e:
@@ -144,7 +201,118 @@ class Task(db.Model):
             return True
         return False
 
+    @classmethod
+    def create_tasks(cls, rows):
+        """
+        Inserts one task per dict of column values in a single flush and
+        commit. Returns the new ids in order.
+        """
+        tasks = [cls(**row) for row in rows]
+        db.session.add_all(tasks)
+        db.session.flush()
+        ids = [task.id for task in tasks]
+        db.session.commit()
+        return ids
+
+    @classmethod
+    def update_tasks(cls, changes, project_id):
+        """
+        Applies changes, a list of (task ids, column values) pairs, with one
+        UPDATE ... WHERE id IN per pair and a single commit. Values must
+        already be validated; @validates doesn't run for bulk updates.
+        Overdue tasks given a due date in the future are reopened.
+        """
+        from .project import Project  # Import when needed
+
+        rescheduled = []
+        for ids, values in changes:
+            cls.query.filter(cls.id.in_(ids)).update(
+                values, synchronize_session=False
+            )
+            if "_due_date" in values or "status" in values:
+                rescheduled.extend(ids)
+        if rescheduled:
+            cls.reopen(rescheduled)
+        # Bulk statements bypass the flush listener that does this
+        Project.bump_cache_version([project_id])
+        db.session.commit()
+
+    @classmethod
+    def delete_tasks(cls, ids, project_id):
+        from . import Project, Tombstone  # Import when needed
+
+        Tombstone.record(project_id, Tombstone.TASK, ids)
+        cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+        Project.bump_cache_version([project_id])
+        db.session.commit()
+
     VALID_STATUSES = ["Not Started", "In Progress", "Overdue", "Completed"]
+    # Statuses the overdue sweep moves to Overdue once the due date passes
+    OPEN_STATUSES = ["Not Started", "In Progress"]
+
+    @classmethod
+    def mark_overdue(cls, now=None, batch_size=1000):
+        """
+        Sets status to Overdue on open tasks whose due date has passed, in
+        batches of at most batch_size rows, each an UPDATE ... WHERE id IN
+        with its own commit so no batch holds locks for long. Returns the
+        number of tasks updated.
+        """
+        from . import Feature, Project  # Import when needed
+
+        now = now or datetime.utcnow()
+        past_due = db.and_(
+            cls._due_date < now, cls.status.in_(cls.OPEN_STATUSES)
+        )
+        updated = 0
+        while True:
+            ids = [
+                task_id
+                for task_id, in cls.query.filter(past_due)
+                .with_entities(cls.id)
+                .order_by(cls.id)
+                .limit(batch_size)
+            ]
+            if not ids:
+                return updated
+            project_ids = [
+                project_id
+                for project_id, in Feature.query.join(cls)
+                .filter(cls.id.in_(ids))
+                .with_entities(Feature.project_id)
+                .distinct()
+            ]
+            # past_due again in case a task was completed in the meantime
+            updated += cls.query.filter(cls.id.in_(ids), past_due).update(
+                {"status": "Overdue"}, synchronize_session=False
+            )
+            # Bulk statements bypass the flush listener that does this
+            Project.bump_cache_version(project_ids)
+            db.session.commit()
+            if len(ids) < batch_size:
+                return updated
+
+    @classmethod
+    def reopen(cls, ids, now=None):
+        """
+        Moves the Overdue tasks among ids that are no longer past due back
+        to an open status: In Progress once they've started, otherwise Not
+        Started. Doesn't commit. Returns the number of tasks updated.
+        """
+        now = now or datetime.utcnow()
+        return cls.query.filter(
+            cls.id.in_(ids),
+            cls.status == "Overdue",
+            db.or_(cls._due_date.is_(None), cls._due_date >= now),
+        ).update(
+            {
+                "status": db.case(
+                    (cls._start_date <= now, "In Progress"),
+                    else_="Not Started",
+                )
+            },
+            synchronize_session=False,
+        )
 
     @validates("status")
     def validates_status(self, key, status):
@@ -0,0 +1,95 @@
+from .db import db
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+
+class Tombstone(db.Model):
+    """
+    Record of a deleted feature, sprint or task, so the change feed can
+    tell polling clients what to drop. Written by the before_flush listener
+    below for ORM deletes; bulk deletes call record() themselves.
+    """
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        db.Index(
+            "ix_tombstones_project_id_deleted_at", "project_id", "deleted_at"
+        ),
+    )
+
+    FEATURE = "feature"
+    SPRINT = "sprint"
+    TASK = "task"
+    # Clients whose watermark is older than this must reload the snapshot
+    RETENTION = timedelta(days=30)
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(
+        db.Integer,
+        db.ForeignKey("projects.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def record(cls, project_id, entity, entity_ids):
+        db.session.add_all(
+            cls(project_id=project_id, entity=entity, entity_id=entity_id)
+            for entity_id in entity_ids
+        )
+
+    @classmethod
+    def purge(cls, before=None):
+        """
+        Deletes tombstones older than before (default: the retention
+        period). Returns the number removed.
+        """
+        before = before or datetime.utcnow() - cls.RETENTION
+        removed = cls.query.filter(cls.deleted_at < before).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        return removed
+
+
+@event.listens_for(db.session, "before_flush")
+def record_tombstones(session, flush_context, instances):
+    from .feature import Feature
+    from .project import Project
+    from .sprint import Sprint
+    from .task import Task
+
+    deleted_projects = set()
+    tombstones = []
+    task_features = {}
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            deleted_projects.add(obj.id)
+        elif isinstance(obj, Feature):
+            tombstones.append((obj.project_id, Tombstone.FEATURE, obj.id))
+        elif isinstance(obj, Sprint):
+            tombstones.append((obj.project_id, Tombstone.SPRINT, obj.id))
+        elif isinstance(obj, Task):
+            task_features[obj.id] = obj.feature_id
+    if task_features:
+        rows = session.connection().execute(
+            db.select(Feature.id, Feature.project_id).where(
+                Feature.id.in_(set(task_features.values()))
+            )
+        )
+        projects = dict(rows.all())
+        tombstones.extend(
+            (projects.get(feature_id), Tombstone.TASK, task_id)
+            for task_id, feature_id in task_features.items()
+        )
+
+    for project_id, entity, entity_id in tombstones:
+        # A deleted project takes its history with it
+        if project_id is not None and project_id not in deleted_projects:
+            session.add(
+                Tombstone(
+                    project_id=project_id, entity=entity, entity_id=entity_id
+                )
+            )
@@ -1,9 +1,42 @@
 from .db import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from .project_access import ProjectAccess
 
 
-class User(db.Model, UserMixin):
+class UserDetailsMixin:
+    """
+    Behaviour shared by the User model and the cached snapshots that
+    flask-login hands out as current_user (see user_cache.py)
+    """
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    # Access checks are primary-key lookups on the project_access table
+    def has_project_access(self, project_id):
+        return ProjectAccess.get_role(self.id, project_id) is not None
+
+    def is_project_owner(self, project_id):
+        role = ProjectAccess.get_role(self.id, project_id)
+        return role == ProjectAccess.OWNER
+
+    def get_project_role(self, project_id):
+        return ProjectAccess.get_role(self.id, project_id)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "full_name": self.full_name,
+        }
+
+
+class User(db.Model, UserMixin, UserDetailsMixin):
     __tablename__ = "users"
 
 
@@ -31,10 +64,6 @@ class User(db.Model, UserMixin):
         passive_deletes="all",
     )
 
-    @property
-    def full_name(self):
-        return f"{self.first_name} {self.last_name}"
-
     @property
     def password(self):
         return self.hashed_password
@@ -45,34 +74,3 @@ class User(db.Model, UserMixin):
 
     def check_password(self, password):
         return check_password_hash(self.password, password)
-
-    def has_project_access(self, project_id):
-        # Check if user is owner
-        is_owner = any(
-            project.id == project_id for project in self.owned_projects
-        )
-
-        # Check if user is member
-        is_member = any(project.id == project_id for project in self.projects)
-
-        return is_owner or is_member
-
-    def is_project_owner(self, project_id):
-        return any(project.id == project_id for project in self.owned_projects)
-
-    def get_project_role(self, project_id):
-        if any(project.id == project_id for project in self.owned_projects):
-            return "owner"
-        if any(project.id == project_id for project in self.projects):
-            return "member"
-        return None
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "full_name": self.full_name,
-        }
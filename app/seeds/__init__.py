@@ -1,9 +1,11 @@
+import click
 from flask.cli import AppGroup
 from .users import seed_users, undo_users
 from .projects import seed_projects, undo_projects
 from .sprints import seed_sprints, undo_sprints
 from .features import seed_features, undo_features
 from .tasks import seed_tasks, undo_tasks
+from .scale import seed_scale
 
 from models import db
 
@@ -30,4 +32,35 @@ def undo():
     undo_features()  # due to foreign key relationships
     undo_sprints()
     undo_projects()
-    undo_users()
\ No newline at end of file
+    undo_users()
+
+
+@seed_commands.command("scale")
+@click.option("--users", default=1000, show_default=True)
+@click.option("--projects", default=200, show_default=True)
+@click.option(
+    "--features-per-project",
+    default=20,
+    show_default=True,
+    help="Mean; project sizes follow a Pareto curve",
+)
+@click.option("--tasks-per-feature", default=25, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--workers", type=int, help="Generator processes (default: CPU count)"
+)
+def scale(
+    users, projects, features_per_project, tasks_per_feature, seed, workers
+):
+    """
+    Replaces all data with a large, skewed synthetic dataset
+    """
+    seed_scale(
+        users=users,
+        projects=projects,
+        features_per_project=features_per_project,
+        tasks_per_feature=tasks_per_feature,
+        seed=seed,
+        workers=workers,
+        log=click.echo,
+    )
@@ -0,0 +1,308 @@
+import csv
+import io
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from models import db, User, Project, Sprint, Feature, Task, ProjectAccess
+from models.project import project_users
+
+# Synthetic data at production scale for load testing.
+#
+# Sizes are skewed the way real boards are: user activity follows a Zipf
+# curve, so a few power users belong to many projects and get most of the
+# assignments, and features per project follow a Pareto curve, so a handful
+# of projects are many times the average. Users, projects, sprints and
+# features are few enough to insert directly. Task rows are generated by a
+# process pool, in chunks, while the parent loads the chunks that are ready
+# with COPY on Postgres and executemany elsewhere.
+
+TASK_COLUMNS = [
+    "feature_id",
+    "name",
+    "description",
+    "status",
+    "priority",
+    "assigned_to",
+    "_created_by",
+    "_start_date",
+    "_due_date",
+    "created_at",
+    "updated_at",
+]
+ROWS_PER_CHUNK = 20000
+INSERT_BATCH = 5000
+
+
+def _zipf_cum_weights(count, exponent=1.1):
+    total, cum_weights = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1 / rank**exponent
+        cum_weights.append(total)
+    return cum_weights
+
+
+def _pick(rng, count, population, cum_weights):
+    """
+    count distinct items, drawn with the given (skewed) weights, in the
+    order they were drawn
+    """
+    picked = {}
+    for item in rng.choices(population, cum_weights=cum_weights, k=count * 2):
+        picked[item] = None
+        if len(picked) == count:
+            return list(picked)
+    while len(picked) < count:
+        picked[rng.choice(population)] = None
+    return list(picked)
+
+
+def _status(rng, start, due, now):
+    if due < now:
+        return "Completed" if rng.random() < 0.7 else "Overdue"
+    if start < now:
+        roll = rng.random()
+        if roll < 0.6:
+            return "In Progress"
+        return "Completed" if roll < 0.75 else "Not Started"
+    return "Not Started"
+
+
+def _task_rows(job):
+    """
+    Task rows for a chunk of features: (seed, now, [(feature id, members,
+    task count)]). Runs in the process pool.
+    """
+    seed, now, features = job
+    rng = random.Random(seed)
+    rows = []
+    for feature_id, members, count in features:
+        # Earlier members (picked with Zipf weights) get more of the work
+        cum_weights = _zipf_cum_weights(len(members), 0.8)
+        for number in range(1, count + 1):
+            start = now + timedelta(hours=rng.randint(-24 * 120, 24 * 14))
+            due = start + timedelta(hours=rng.randint(4, 24 * 21))
+            assignee = (
+                rng.choices(members, cum_weights=cum_weights)[0]
+                if rng.random() < 0.9
+                else None
+            )
+            rows.append(
+                (
+                    feature_id,
+                    f"Task {number} of feature {feature_id}",
+                    "Generated by flask seed scale",
+                    _status(rng, start, due, now),
+                    rng.randint(0, 3),
+                    assignee,
+                    rng.choice(members),
+                    start,
+                    due,
+                    start,
+                    start,
+                )
+            )
+    return rows
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.session.execute(table.insert(), rows[start : start + INSERT_BATCH])
+
+
+def _copy_tasks(connection, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    cursor.copy_expert(
+        f"COPY tasks ({', '.join(TASK_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def _load_tasks(connection, rows):
+    if connection.dialect.name == "postgresql":
+        _copy_tasks(connection, rows)
+    else:
+        connection.execute(
+            Task.__table__.insert(),
+            [dict(zip(TASK_COLUMNS, row)) for row in rows],
+        )
+
+
+def clear_tables():
+    """
+    Empties every table, as `flask seed undo` does but on any database
+    """
+    if db.engine.dialect.name == "postgresql":
+        tables = ", ".join(t.name for t in db.metadata.sorted_tables)
+        db.session.execute(
+            db.text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE")
+        )
+    else:
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+    db.session.commit()
+
+
+def _reset_sequences(tables):
+    # Rows above were inserted with explicit ids
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.session.execute(
+            db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce((SELECT max(id) FROM {table}), 1))"
+            )
+        )
+
+
+def seed_scale(
+    users=1000,
+    projects=200,
+    features_per_project=20,
+    tasks_per_feature=25,
+    seed=0,
+    workers=None,
+    log=print,
+):
+    """
+    Replaces the database contents with generated data. The per-project
+    and per-feature counts are means. Everyone's password is "password".
+    Returns the row counts.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    started = time.perf_counter()
+    clear_tables()
+
+    password = generate_password_hash("password")
+    user_ids = list(range(1, users + 1))
+    user_weights = _zipf_cum_weights(users)
+    _insert(
+        User.__table__,
+        [
+            {
+                "id": user_id,
+                "username": f"user{user_id}",
+                "email": f"user{user_id}@example.com",
+                "first_name": "Load",
+                "last_name": f"User{user_id}",
+                "hashed_password": password,
+            }
+            for user_id in user_ids
+        ],
+    )
+
+    # Pareto(1.5) has mean 3; scale it to the requested mean
+    scale = features_per_project / 3
+    project_rows, member_rows, sprint_rows, feature_rows = [], [], [], []
+    task_jobs, job, job_rows = [], [], 0
+    for project_id in range(1, projects + 1):
+        feature_count = max(
+            1,
+            min(
+                round(rng.paretovariate(1.5) * scale),
+                features_per_project * 50,
+            ),
+        )
+        members = _pick(
+            rng,
+            min(users, 3 + feature_count // 3),
+            user_ids,
+            user_weights,
+        )
+        project_rows.append(
+            {
+                "id": project_id,
+                "name": f"Project {project_id}",
+                "description": "Generated by flask seed scale",
+                "owner_id": members[0],
+                "due_date": now + timedelta(days=rng.randint(-30, 180)),
+                "created_at": now - timedelta(days=180),
+                "updated_at": now,
+            }
+        )
+        member_rows.extend(
+            {"project_id": project_id, "user_id": user_id}
+            for user_id in members
+        )
+
+        sprint_ids = []
+        for number in range(min(12, max(1, feature_count // 5))):
+            start = now + timedelta(days=14 * (number - 6))
+            sprint_ids.append(len(sprint_rows) + 1)
+            sprint_rows.append(
+                {
+                    "id": sprint_ids[-1],
+                    "project_id": project_id,
+                    "name": f"Sprint {number + 1}",
+                    "_start_date": start,
+                    "_end_date": start + timedelta(days=13),
+                    "created_at": now - timedelta(days=180),
+                    "updated_at": now,
+                }
+            )
+
+        for _ in range(feature_count):
+            feature_id = len(feature_rows) + 1
+            feature_rows.append(
+                {
+                    "id": feature_id,
+                    "project_id": project_id,
+                    "sprint_id": (
+                        rng.choice(sprint_ids) if rng.random() < 0.8 else None
+                    ),
+                    "name": f"Feature {feature_id}",
+                    "description": "Generated by flask seed scale",
+                    "status": rng.choice(Feature.VALID_STATUSES),
+                    "priority": rng.randint(0, 3),
+                    "created_at": now - timedelta(days=180),
+                    "updated_at": now,
+                }
+            )
+            task_count = rng.randint(
+                tasks_per_feature // 2, tasks_per_feature * 3 // 2
+            )
+            job.append((feature_id, members, task_count))
+            job_rows += task_count
+            if job_rows >= ROWS_PER_CHUNK:
+                task_jobs.append((rng.getrandbits(32), now, job))
+                job, job_rows = [], 0
+    if job:
+        task_jobs.append((rng.getrandbits(32), now, job))
+
+    _insert(Project.__table__, project_rows)
+    _insert(project_users, member_rows)
+    ProjectAccess.rebuild()
+    _insert(Sprint.__table__, sprint_rows)
+    _insert(Feature.__table__, feature_rows)
+    _reset_sequences(["users", "projects", "sprints", "features"])
+    db.session.commit()
+    log(
+        f"{users} users, {projects} projects, {len(sprint_rows)} sprints, "
+        f"{len(feature_rows)} features in "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+
+    tasks = 0
+    connection = db.session.connection()
+    with multiprocessing.Pool(workers) as pool:
+        for rows in pool.imap(_task_rows, task_jobs):
+            _load_tasks(connection, rows)
+            tasks += len(rows)
+    db.session.commit()
+    elapsed = time.perf_counter() - started
+    log(f"{tasks} tasks, {elapsed:.1f}s in total")
+
+    return {
+        "users": users,
+        "projects": projects,
+        "sprints": len(sprint_rows),
+        "features": len(feature_rows),
+        "tasks": tasks,
+        "seconds": round(elapsed, 1),
+    }
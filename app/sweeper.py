@@ -0,0 +1,107 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+import click
+from flask.cli import AppGroup
+from models import Task, Tombstone
+
+logger = logging.getLogger("taskflow.sweeper")
+
+task_commands = AppGroup("tasks")
+
+
+def sweep_overdue(batch_size):
+    """
+    Runs the overdue sweep and returns (tasks updated, elapsed seconds)
+    """
+    started = time.perf_counter()
+    updated = Task.mark_overdue(batch_size=batch_size)
+    return updated, time.perf_counter() - started
+
+
+@task_commands.command("sweep-overdue")
+@click.option("--batch-size", default=1000, show_default=True)
+def sweep_overdue_command(batch_size):
+    """
+    Marks open tasks whose due date has passed as Overdue
+    """
+    updated, elapsed = sweep_overdue(batch_size)
+    click.echo(f"Marked {updated} tasks overdue in {elapsed * 1000:.1f} ms")
+
+
+class OverdueSweeper:
+    """
+    Runs the overdue sweep (and tombstone purge) every
+    OVERDUE_SWEEP_INTERVAL seconds on a daemon thread. 0 disables it.
+
+    Every worker starts the thread, but a non-blocking lock on
+    OVERDUE_SWEEP_LOCK_PATH lets only one process per host sweep at a time.
+    The sweep is idempotent, so a second host sweeping as well only
+    duplicates work.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 0
+        self.batch_size = 1000
+        self.lock_path = None
+        self.last_run = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config["OVERDUE_SWEEP_INTERVAL"]
+        self.batch_size = app.config["OVERDUE_SWEEP_BATCH_SIZE"]
+        self.lock_path = app.config["OVERDUE_SWEEP_LOCK_PATH"]
+        if self.interval > 0:
+            # Started lazily so the thread is created in each worker
+            # process rather than in a pre-fork master
+            app.before_request(self.start)
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        with open(self.lock_path, "a") as lock_file:
+            while True:
+                time.sleep(self.interval)
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # another worker is sweeping
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("overdue sweep failed")
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def sweep(self):
+        with self.app.app_context():
+            updated, elapsed = sweep_overdue(self.batch_size)
+            purged = Tombstone.purge()
+        self.last_run = {
+            "at": time.time(),
+            "tasks_updated": updated,
+            "tombstones_purged": purged,
+            "elapsed_ms": round(elapsed * 1000, 1),
+        }
+        logger.info(
+            "marked %d tasks overdue in %.1f ms, purged %d tombstones",
+            updated,
+            elapsed * 1000,
+            purged,
+        )
+
+    def stats(self):
+        return {"interval": self.interval, "last_run": self.last_run}
+
+
+overdue_sweeper = OverdueSweeper()
@@ -0,0 +1,54 @@
+import importlib
+import os
+import sys
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+os.environ["APP_CONFIG"] = "test"
+os.environ.setdefault("SECRET_KEY", "test")
+
+
+@pytest.fixture
+def app():
+    """
+    The app with empty tables. No app context stays pushed, so each test
+    client request gets its own, as it would in production; tests push one
+    (with app.app_context()) around their own database work.
+    """
+    app = importlib.import_module("__init__").app
+    from models import db, user_cache
+    from api.response_cache import response_cache
+
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+    response_cache.backend.clear()
+    user_cache.invalidate()
+
+
+@pytest.fixture
+def user_id(app):
+    from models import db, User
+
+    with app.app_context():
+        user = User(
+            username="tester",
+            email="tester@example.com",
+            password="password",
+            first_name="Test",
+            last_name="User",
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    return client
@@ -0,0 +1,29 @@
+from datetime import datetime
+from models import db, Project, Feature
+
+
+def test_bulk_create_reports_non_string_dates_per_task(app, client, user_id):
+    with app.app_context():
+        project = Project(
+            name="Board",
+            description="Bulk task test",
+            owner_id=user_id,
+            due_date=datetime(2030, 1, 1),
+        )
+        db.session.add(project)
+        db.session.flush()
+        feature = Feature(project_id=project.id, name="Feature")
+        db.session.add(feature)
+        db.session.commit()
+        project_id, feature_id = project.id, feature.id
+
+    task = {"feature_id": feature_id, "name": "Task", "description": "Bulk"}
+    response = client.post(
+        f"/api/projects/{project_id}/tasks/bulk",
+        json={"tasks": [{**task, "due_date": 123}, task]},
+    )
+    assert response.status_code == 200
+    first, second = response.get_json()["results"]
+    assert first["status"] == 400
+    assert "due_date" in first["errors"]
+    assert second["status"] == 201
@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy import exc
+from models import db
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app):
+    with app.app_context():
+        connection = db.session.connection()
+        with pytest.raises(exc.OperationalError):
+            connection.execute(db.text("SELECT * FROM missing_table"))
+        db.session.rollback()
+
+        connection = db.session.connection()
+        connection.execute(db.text("SELECT 1"))
+        assert "query_started" not in connection.info
@@ -0,0 +1,20 @@
+def test_metrics_require_login(app):
+    client = app.test_client()
+    # login_view redirects to the unauthorized endpoint
+    response = client.get("/api/metrics", follow_redirects=True)
+    assert response.status_code == 401
+
+
+def test_metrics_for_logged_in_user(client):
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert "db_pool" in response.get_json()
+
+
+def test_each_request_loads_the_user(client):
+    def lookups():
+        stats = client.get("/api/metrics").get_json()["user_cache"]
+        return stats["hits"] + stats["misses"]
+
+    before = lookups()
+    assert lookups() == before + 1
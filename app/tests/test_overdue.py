@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from models import db, Project, Feature, Task
+
+
+def make_overdue_task(app, user_id):
+    """
+    A started task swept to Overdue. Returns (project, feature, task) ids.
+    """
+    with app.app_context():
+        project = Project(
+            name="Board",
+            description="Overdue test",
+            owner_id=user_id,
+            due_date=datetime(2030, 1, 1),
+        )
+        db.session.add(project)
+        db.session.flush()
+        feature = Feature(project_id=project.id, name="Feature")
+        db.session.add(feature)
+        db.session.flush()
+        now = datetime.utcnow()
+        task = Task(
+            feature_id=feature.id,
+            name="Task",
+            description="Overdue",
+            status="In Progress",
+            _created_by=user_id,
+            _start_date=now - timedelta(days=3),
+            _due_date=now - timedelta(days=1),
+        )
+        db.session.add(task)
+        db.session.commit()
+        ids = project.id, feature.id, task.id
+        assert Task.mark_overdue() == 1
+        return ids
+
+
+def overdue_count(client, project_id):
+    summary = client.get(f"/api/projects/{project_id}/summary").get_json()
+    return summary["totals"]["overdue"]
+
+
+def test_put_with_a_later_due_date_reopens_the_task(app, client, user_id):
+    project_id, feature_id, task_id = make_overdue_task(app, user_id)
+    assert overdue_count(client, project_id) == 1
+
+    due = (datetime.utcnow() + timedelta(days=7)).isoformat()
+    response = client.put(
+        f"/api/projects/{project_id}/features/{feature_id}"
+        f"/tasks/{task_id}/",
+        json={"due_date": due},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "In Progress"
+    assert overdue_count(client, project_id) == 0
+
+
+def test_bulk_patch_with_a_later_due_date_reopens_the_task(
+    app, client, user_id
+):
+    project_id, _, task_id = make_overdue_task(app, user_id)
+
+    due = (datetime.utcnow() + timedelta(days=7)).isoformat()
+    response = client.patch(
+        f"/api/projects/{project_id}/tasks/bulk",
+        json={"tasks": [{"id": task_id, "due_date": due}]},
+    )
+    (result,) = response.get_json()["results"]
+    assert result["task"]["status"] == "In Progress"
+    assert overdue_count(client, project_id) == 0
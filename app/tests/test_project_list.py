@@ -0,0 +1,74 @@
+from datetime import datetime
+from models import db, Project, User
+
+
+def make_project(app, owner_id):
+    with app.app_context():
+        project = Project(
+            name="Board",
+            description="ETag test",
+            owner_id=owner_id,
+            due_date=datetime(2030, 1, 1),
+        )
+        db.session.add(project)
+        db.session.commit()
+        return project.id
+
+
+def make_users(app, count):
+    with app.app_context():
+        users = [
+            User(
+                username=f"member{n}",
+                email=f"member{n}@example.com",
+                password="password",
+                first_name="Board",
+                last_name=f"Member{n}",
+            )
+            for n in range(count)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        return [user.id for user in users]
+
+
+def add_members(app, project_id, user_ids):
+    with app.app_context():
+        for user_id in user_ids:
+            Project.add_user_to_project(user_id, project_id)
+
+
+def remove_members(app, project_id, user_ids):
+    with app.app_context():
+        for user_id in user_ids:
+            Project.remove_user_from_project(user_id, project_id)
+
+
+def test_etag_changes_when_owner_joins_project_users(app, client, user_id):
+    project_id = make_project(app, user_id)
+    first = client.get("/api/projects")
+    assert first.get_json()["projects"][0]["members"] == []
+
+    add_members(app, project_id, [user_id])
+    second = client.get(
+        "/api/projects", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 200
+    assert second.get_json()["projects"][0]["members"] == [user_id]
+
+
+def test_etag_changes_when_members_are_swapped(app, client, user_id):
+    project_id = make_project(app, user_id)
+    assert make_users(app, 5) == [2, 3, 4, 5, 6]
+    add_members(app, project_id, [3, 6])
+    first = client.get("/api/projects")
+    assert first.get_json()["projects"][0]["members"] == [3, 6]
+
+    # Same count and the same sum of member ids
+    remove_members(app, project_id, [3, 6])
+    add_members(app, project_id, [4, 5])
+    second = client.get(
+        "/api/projects", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 200
+    assert second.get_json()["projects"][0]["members"] == [4, 5]
@@ -0,0 +1,40 @@
+from datetime import datetime
+from models import db, Project, Feature, Task
+
+
+def test_features_of_one_project_are_cached_separately(app, client, user_id):
+    with app.app_context():
+        project = Project(
+            name="Board",
+            description="Response cache test",
+            owner_id=user_id,
+            due_date=datetime(2030, 1, 1),
+        )
+        db.session.add(project)
+        db.session.flush()
+        features = [
+            Feature(project_id=project.id, name=f"Feature {n}")
+            for n in (1, 2)
+        ]
+        db.session.add_all(features)
+        db.session.flush()
+        db.session.add_all(
+            Task(
+                feature_id=feature.id,
+                name=f"Task of {feature.name}",
+                _created_by=user_id,
+            )
+            for feature in features
+        )
+        db.session.commit()
+        project_id = project.id
+        feature_ids = [feature.id for feature in features]
+
+    for feature_id in feature_ids:
+        url = f"/api/projects/{project_id}/features/{feature_id}/tasks"
+        response = client.get(url)
+        assert response.status_code == 200
+        tasks = response.get_json()
+        assert [task["feature_id"] for task in tasks] == [feature_id]
+        # A second read is served from the cache
+        assert client.get(url).get_json() == tasks
@@ -0,0 +1,83 @@
+from datetime import datetime
+from models import db, Feature, Project, Task, User
+
+
+def make_project(app, owner_id):
+    """
+    A project listing its owner and one other member in project_users.
+    Returns (project id, member id).
+    """
+    with app.app_context():
+        member = User(
+            username="member",
+            email="member@example.com",
+            password="password",
+            first_name="Board",
+            last_name="Member",
+        )
+        project = Project(
+            name="Board",
+            description="Snapshot test",
+            owner_id=owner_id,
+            due_date=datetime(2030, 1, 1),
+        )
+        db.session.add_all([project, member])
+        db.session.commit()
+        # The owner is listed in project_users as well
+        Project.add_user_to_project(owner_id, project.id)
+        Project.add_user_to_project(member.id, project.id)
+        return project.id, member.id
+
+
+def test_snapshot_watermark_is_taken_per_request(app, client, user_id):
+    project_id, _ = make_project(app, user_id)
+    url = f"/api/projects/{project_id}/snapshot"
+    first = client.get(url).get_json()["watermark"]
+    second = client.get(url).get_json()["watermark"]
+    assert second > first
+
+
+def test_snapshot_members_match_project(app, client, user_id):
+    project_id, member_id = make_project(app, user_id)
+    snapshot = client.get(f"/api/projects/{project_id}/snapshot").get_json()
+    listed = client.get(f"/api/projects/{project_id}").get_json()
+
+    assert snapshot["project"]["members"] == listed["members"]
+    assert sorted(snapshot["project"]["members"]) == [user_id, member_id]
+    roles = {u["id"]: u["role"] for u in snapshot["users"].values()}
+    assert roles == {user_id: "owner", member_id: "member"}
+
+
+def test_snapshot_skips_tasks_of_features_it_did_not_read(
+    app, client, user_id, monkeypatch
+):
+    project_id, _ = make_project(app, user_id)
+    with app.app_context():
+        features = [
+            Feature(project_id=project_id, name=f"F{n}") for n in (1, 2)
+        ]
+        db.session.add_all(features)
+        db.session.flush()
+        for feature in features:
+            db.session.add(
+                Task(feature_id=feature.id, name="Task", _created_by=user_id)
+            )
+        db.session.commit()
+        first_id, late_id = (feature.id for feature in features)
+
+    # The second feature and its task land between the feature and task reads
+    by_project = Feature.get_features_by_project
+    monkeypatch.setattr(
+        Feature,
+        "get_features_by_project",
+        lambda project_id: by_project(project_id).filter(
+            Feature.id != late_id
+        ),
+    )
+    response = client.get(f"/api/projects/{project_id}/snapshot")
+    assert response.status_code == 200
+    snapshot = response.get_json()
+    assert list(snapshot["features"]) == [str(first_id)]
+    assert [task["feature_id"] for task in snapshot["tasks"].values()] == [
+        first_id
+    ]